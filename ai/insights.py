@@ -5,9 +5,49 @@ Génère des punchlines franches et inconfortables
 basées sur l'analyse des trades.
 """
 
-import random
+import heapq
+from bisect import bisect_left
+from functools import lru_cache
 
+import numpy as np
 
+
+# Templates de punchlines par niveau de destruction.
+# Seule la variante sélectionnée est formatée.
+_PUNCHLINES_RED = (
+    "🔴 {pct:.0f}% de tes trades sont auto-destructeurs. Tu ne trades pas, tu donnes ton argent.",
+    "🔴 Près de la moitié de tes trades ({pct:.0f}%) sont du sabotage. Tu es ton propre ennemi.",
+    "🔴 {pct:.0f}% de destruction. Ce n'est pas du trading, c'est de l'auto-mutilation financière.",
+)
+_PUNCHLINES_ORANGE = (
+    "🟠 {pct:.0f}% de trades destructeurs. Un quart de ton activité te coûte de l'argent.",
+    "🟠 1 trade sur 4 est destructeur ({pct:.0f}%). Ton ego te coûte cher.",
+    "🟠 {pct:.0f}% de tes décisions sont impulsives. Tu confonds action et performance.",
+)
+_PUNCHLINES_YELLOW = (
+    "🟡 {pct:.0f}% de trades destructeurs. Tu peux faire mieux.",
+    "🟡 Encore {pct:.0f}% de trades sabotés. Chaque % compte.",
+    "🟡 {pct:.0f}% de tes trades sont évitables. La discipline est un choix.",
+)
+_PUNCHLINES_GREEN = (
+    "🟢 Seulement {pct:.0f}% de trades destructeurs. Discipline solide.",
+    "🟢 {pct:.0f}% de destruction. Tu fais partie des traders disciplinés.",
+    "🟢 Moins de 10% de trades destructeurs. Maintiens ce niveau.",
+)
+
+_FALSE_GOOD_WARNING = "\n⚠️ Attention: {pct:.0f}% de tes gains viennent de trades indisciplinés. Profits chanceux."
+
+# Seuils (exclusifs) de % destructeur -> bucket de templates
+_THRESHOLDS = (10, 25, 40)
+_BUCKETS = (_PUNCHLINES_GREEN, _PUNCHLINES_YELLOW, _PUNCHLINES_ORANGE, _PUNCHLINES_RED)
+
+
+def _select_bucket(pct_destructive: float) -> tuple:
+    """Sélectionne les templates de punchline selon le taux de destruction."""
+    return _BUCKETS[bisect_left(_THRESHOLDS, pct_destructive)]
+
+
+@lru_cache(maxsize=32)
 def generate_main_punchline(pct_destructive: float, pct_false_good: float, 
                             total_pnl: float, winrate: float) -> str:
     """
@@ -16,6 +56,9 @@ def generate_main_punchline(pct_destructive: float, pct_false_good: float,
     Ton: franc, analytique, inconfortable.
     Aucune référence au marché.
     
+    Fonction pure (variante choisie de façon déterministe),
+    donc mémoïsée: les reruns sur les mêmes données ne refont rien.
+    
     Args:
         pct_destructive: % de trades destructeurs
         pct_false_good: % de faux bons trades
@@ -27,36 +70,14 @@ def generate_main_punchline(pct_destructive: float, pct_false_good: float,
     """
     
     # Catégorisation selon le niveau de destruction
-    if pct_destructive > 40:
-        punchlines = [
-            f"🔴 {pct_destructive:.0f}% de tes trades sont auto-destructeurs. Tu ne trades pas, tu donnes ton argent.",
-            f"🔴 Près de la moitié de tes trades ({pct_destructive:.0f}%) sont du sabotage. Tu es ton propre ennemi.",
-            f"🔴 {pct_destructive:.0f}% de destruction. Ce n'est pas du trading, c'est de l'auto-mutilation financière.",
-        ]
-    elif pct_destructive > 25:
-        punchlines = [
-            f"🟠 {pct_destructive:.0f}% de trades destructeurs. Un quart de ton activité te coûte de l'argent.",
-            f"🟠 1 trade sur 4 est destructeur ({pct_destructive:.0f}%). Ton ego te coûte cher.",
-            f"🟠 {pct_destructive:.0f}% de tes décisions sont impulsives. Tu confonds action et performance.",
-        ]
-    elif pct_destructive > 10:
-        punchlines = [
-            f"🟡 {pct_destructive:.0f}% de trades destructeurs. Tu peux faire mieux.",
-            f"🟡 Encore {pct_destructive:.0f}% de trades sabotés. Chaque % compte.",
-            f"🟡 {pct_destructive:.0f}% de tes trades sont évitables. La discipline est un choix.",
-        ]
-    else:
-        punchlines = [
-            f"🟢 Seulement {pct_destructive:.0f}% de trades destructeurs. Discipline solide.",
-            f"🟢 {pct_destructive:.0f}% de destruction. Tu fais partie des traders disciplinés.",
-            f"🟢 Moins de 10% de trades destructeurs. Maintiens ce niveau.",
-        ]
+    templates = _select_bucket(pct_destructive)
     
-    main = random.choice(punchlines)
+    # Variante déterministe (rotation selon le % affiché), puis formatage de celle-ci seule
+    main = templates[int(round(pct_destructive)) % len(templates)].format(pct=pct_destructive)
     
     # Ajouter un contexte sur les faux bons trades
     if pct_false_good > 20:
-        main += f"\n⚠️ Attention: {pct_false_good:.0f}% de tes gains viennent de trades indisciplinés. Profits chanceux."
+        main += _FALSE_GOOD_WARNING.format(pct=pct_false_good)
     
     return main
 
@@ -95,20 +116,21 @@ def generate_temporal_insight(hourly_stats: dict) -> str:
         return ""
     
     # Trouver les heures les plus profitables et les plus destructrices
-    sorted_hours = sorted(hourly_stats.items(), key=lambda x: x[1].get('pnl', 0))
-    
-    worst_hours = [h for h, s in sorted_hours[:3] if s.get('pnl', 0) < 0]
-    best_hours = [h for h, s in sorted_hours[-3:] if s.get('pnl', 0) > 0]
+    # (sélection partielle top/bottom 3, sans trier toutes les heures)
+    get_pnl = lambda x: x[1].get('pnl', 0)
+    worst = heapq.nsmallest(3, hourly_stats.items(), key=get_pnl)
+    best = heapq.nlargest(3, hourly_stats.items(), key=get_pnl)[::-1]
     
-    insights = []
+    worst_hours = [h for h, s in worst if s.get('pnl', 0) < 0]
+    best_hours = [h for h, s in best if s.get('pnl', 0) > 0]
     
-    if worst_hours:
-        insights.append(f"🚫 Heures toxiques: {', '.join(f'{h}h' for h in worst_hours)}")
+    # Au plus 2 segments: concaténation directe plutôt qu'une liste + join
+    toxic = f"🚫 Heures toxiques: {', '.join(f'{h}h' for h in worst_hours)}" if worst_hours else ""
+    profitable = f"✅ Heures profitables: {', '.join(f'{h}h' for h in best_hours)}" if best_hours else ""
     
-    if best_hours:
-        insights.append(f"✅ Heures profitables: {', '.join(f'{h}h' for h in best_hours)}")
-    
-    return " | ".join(insights) if insights else ""
+    if toxic and profitable:
+        return f"{toxic} | {profitable}"
+    return toxic or profitable
 
 
 def generate_behavioral_insight(revenge_trades: int, impulse_trades: int, 
@@ -122,18 +144,18 @@ def generate_behavioral_insight(revenge_trades: int, impulse_trades: int,
     revenge_pct = (revenge_trades / total_trades) * 100
     impulse_pct = (impulse_trades / total_trades) * 100
     
-    insights = []
-    
-    if revenge_pct > 15:
-        insights.append(f"🔥 {revenge_pct:.0f}% de revenge trading détecté")
+    is_revenge = revenge_pct > 15
+    is_impulse = impulse_pct > 20
     
-    if impulse_pct > 20:
-        insights.append(f"⚡ {impulse_pct:.0f}% de trades impulsifs (<5min après le précédent)")
+    if is_revenge and is_impulse:
+        return (f"🔥 {revenge_pct:.0f}% de revenge trading détecté | "
+                f"⚡ {impulse_pct:.0f}% de trades impulsifs (<5min après le précédent)")
+    if is_revenge:
+        return f"🔥 {revenge_pct:.0f}% de revenge trading détecté"
+    if is_impulse:
+        return f"⚡ {impulse_pct:.0f}% de trades impulsifs (<5min après le précédent)"
     
-    if not insights:
-        return "✅ Pas de pattern de revenge trading ou d'impulsivité majeur détecté"
-    
-    return " | ".join(insights)
+    return "✅ Pas de pattern de revenge trading ou d'impulsivité majeur détecté"
 
 
 def generate_all_insights(df, stats: dict) -> dict:
@@ -147,24 +169,109 @@ def generate_all_insights(df, stats: dict) -> dict:
     Returns:
         Dict avec tous les insights textuels
     """
+    n = len(df)
+    if n == 0:
+        return {
+            'main_punchline': generate_main_punchline(0, 0, 0, 0),
+            'direction_insight': '',
+            'behavioral_insight': '',
+        }
+    
+    # Une seule agrégation par direction pour toutes les sommes (PnL + flags);
+    # les totaux globaux se déduisent des sous-totaux par direction
+    by_direction = df.groupby('direction', sort=False, observed=True, dropna=False).agg(
+        pnl=('pnl', 'sum'),
+        nb_trades=('pnl', 'size'),
+        destructive=('is_destructive', 'sum'),
+        false_good=('is_false_good', 'sum'),
+        wins=('is_win', 'sum'),
+    )
+    totals = by_direction.sum()
+    
     # Calculer les métriques nécessaires
-    pct_destructive = (df['is_destructive'].sum() / len(df)) * 100 if len(df) > 0 else 0
-    pct_false_good = (df['is_false_good'].sum() / len(df)) * 100 if len(df) > 0 else 0
-    total_pnl = df['pnl'].sum()
-    winrate = (df['is_win'].sum() / len(df)) * 100 if len(df) > 0 else 0
+    pct_destructive = totals['destructive'] * 100.0 / n
+    pct_false_good = totals['false_good'] * 100.0 / n
+    total_pnl = totals['pnl']
+    winrate = totals['wins'] * 100.0 / n
     
-    # Stats par direction
-    long_df = df[df['direction'] == 'LONG']
-    short_df = df[df['direction'] == 'SHORT']
-    long_pnl = long_df['pnl'].sum() if len(long_df) > 0 else 0
-    short_pnl = short_df['pnl'].sum() if len(short_df) > 0 else 0
+    # Stats par direction (direction absente -> 0)
+    long_pnl = by_direction['pnl'].get('LONG', 0)
+    short_pnl = by_direction['pnl'].get('SHORT', 0)
+    long_count = int(by_direction['nb_trades'].get('LONG', 0))
+    short_count = int(by_direction['nb_trades'].get('SHORT', 0))
     
-    # Revenge & impulse trades
-    revenge_trades = (df['prev_loss_streak'] >= 5).sum() if 'prev_loss_streak' in df.columns else 0
-    impulse_trades = (df['time_since_prev'] < 5).sum() if 'time_since_prev' in df.columns else 0
+    # Revenge & impulse trades (colonnes optionnelles, testées une fois)
+    columns = df.columns
+    has_loss_streak = 'prev_loss_streak' in columns
+    has_time_since_prev = 'time_since_prev' in columns
+    revenge_trades = np.count_nonzero(df['prev_loss_streak'].to_numpy() >= 5) if has_loss_streak else 0
+    impulse_trades = np.count_nonzero(df['time_since_prev'].to_numpy() < 5) if has_time_since_prev else 0
     
     return {
         'main_punchline': generate_main_punchline(pct_destructive, pct_false_good, total_pnl, winrate),
-        'direction_insight': generate_direction_insight(long_pnl, short_pnl, len(long_df), len(short_df)),
-        'behavioral_insight': generate_behavioral_insight(revenge_trades, impulse_trades, len(df)),
+        'direction_insight': generate_direction_insight(long_pnl, short_pnl, long_count, short_count),
+        'behavioral_insight': generate_behavioral_insight(revenge_trades, impulse_trades, n),
+    }
+
+
+def generate_all_insights_batch(df, account_col: str = 'uid') -> dict:
+    """
+    Génère les insights de plusieurs comptes en une seule agrégation.
+    
+    Toutes les métriques par compte sont calculées par un unique groupby,
+    seules les chaînes sont ensuite formatées compte par compte.
+    
+    Args:
+        df: DataFrame des trades analysés (plusieurs comptes)
+        account_col: Colonne identifiant le compte (UID MEXC par défaut)
+    
+    Returns:
+        Dict {compte: dict d'insights} (même format que generate_all_insights)
+    """
+    if len(df) == 0:
+        return {}
+    
+    columns = df.columns
+    pnl = df['pnl']
+    direction = df['direction']
+    is_long = direction == 'LONG'
+    is_short = direction == 'SHORT'
+    
+    # Colonnes dérivées sommables: le PnL par direction devient une simple somme
+    work = df.assign(
+        _long_pnl=pnl.where(is_long, 0),
+        _short_pnl=pnl.where(is_short, 0),
+        _is_long=is_long,
+        _is_short=is_short,
+        _revenge=(df['prev_loss_streak'] >= 5) if 'prev_loss_streak' in columns else False,
+        _impulse=(df['time_since_prev'] < 5) if 'time_since_prev' in columns else False,
+    )
+    
+    agg = work.groupby(account_col, sort=False, observed=True).agg(
+        nb_trades=('pnl', 'size'),
+        pnl=('pnl', 'sum'),
+        destructive=('is_destructive', 'sum'),
+        false_good=('is_false_good', 'sum'),
+        wins=('is_win', 'sum'),
+        long_pnl=('_long_pnl', 'sum'),
+        short_pnl=('_short_pnl', 'sum'),
+        long_count=('_is_long', 'sum'),
+        short_count=('_is_short', 'sum'),
+        revenge=('_revenge', 'sum'),
+        impulse=('_impulse', 'sum'),
+    )
+    
+    # Pourcentages vectorisés sur l'ensemble des comptes
+    agg['pct_destructive'] = agg['destructive'] * 100.0 / agg['nb_trades']
+    agg['pct_false_good'] = agg['false_good'] * 100.0 / agg['nb_trades']
+    agg['winrate'] = agg['wins'] * 100.0 / agg['nb_trades']
+    
+    return {
+        row.Index: {
+            'main_punchline': generate_main_punchline(row.pct_destructive, row.pct_false_good, row.pnl, row.winrate),
+            'direction_insight': generate_direction_insight(row.long_pnl, row.short_pnl,
+                                                            int(row.long_count), int(row.short_count)),
+            'behavioral_insight': generate_behavioral_insight(row.revenge, row.impulse, row.nb_trades),
+        }
+        for row in agg.itertuples()
     }
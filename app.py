@@ -14,28 +14,34 @@ Usage: streamlit run app.py
 
 import streamlit as st
 import pandas as pd
+import numpy as np
+import glob
+import hashlib
+import re
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from data_loader import normalize_data
 from ml.scoring import calculate_discipline_score, label_trades, get_discipline_summary
-from ml.clustering import perform_clustering, get_cluster_profiles, get_cluster_summary
+from ml.clustering import get_cluster_profiles
 from ml.dna import extract_trade_dna, get_dna_recommendations
 from ai.insights import generate_all_insights
 from stats.global_stats import calculate_global_stats
 from stats.direction_stats import calculate_direction_stats, format_direction_comparison
 from stats.temporal_stats import (calculate_hourly_stats, calculate_session_stats, 
-                                   calculate_daily_stats, get_toxic_hours, get_profitable_hours)
+                                   calculate_daily_stats, partition_hours)
 from stats.asset_stats import calculate_asset_stats, calculate_cross_analysis
 from stats.risk_stats import calculate_risk_stats, calculate_leverage_brackets, analyze_leverage_impact
 from stats.behavioral_stats import calculate_behavioral_stats, detect_behavioral_patterns
 from stats.duration_stats import calculate_duration_stats, calculate_duration_brackets
 from stats.execution_stats import calculate_execution_stats
-from stats.robustness import monte_carlo_simulation, format_robustness_summary
-from stats.visualizations import generate_equity_curve_data, generate_calendar_heatmap_data, get_pnl_color
+from stats.visualizations import (generate_equity_and_drawdown, generate_calendar_heatmap_data,
+                                  get_monthly_calendar_matrix)
+from stats._common import SortedTrades
 from stats.trade_types import add_trade_type_column, calculate_trade_type_stats, calculate_trade_type_by_direction, calculate_tiltmeter
 
 # ----- CONFIG -----
@@ -133,6 +139,10 @@ st.markdown("---")
 # ----- AUTO-DETECT FILES IN APP FOLDER -----
 APP_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Motifs de noms des exports MEXC (insensibles à la casse, mots dans n'importe quel ordre)
+POSITIONS_FILE_PATTERN = re.compile(r'position.*(history|mexc)|(history|mexc).*position', re.IGNORECASE)
+ORDERS_FILE_PATTERN = re.compile(r'ordre|order|historique.*contrat|contrat.*historique', re.IGNORECASE)
+
 def find_mexc_files():
     """
     Cherche automatiquement les fichiers MEXC dans le dossier de l'app.
@@ -141,26 +151,19 @@ def find_mexc_files():
     positions_file = None
     orders_file = None
     
-    for filename in os.listdir(APP_DIR):
-        filepath = os.path.join(APP_DIR, filename)
-        if not os.path.isfile(filepath):
-            continue
-        if not filename.endswith(('.xlsx', '.xls', '.csv')):
-            continue
-        
-        filename_lower = filename.lower()
-        
-        # Détecter fichier positions
-        if 'position' in filename_lower and 'history' in filename_lower:
-            positions_file = filepath
-        elif 'position' in filename_lower and 'mexc' in filename_lower:
-            positions_file = filepath
+    # scandir: le type de l'entrée est connu sans stat() supplémentaire
+    with os.scandir(APP_DIR) as entries:
+        for entry in entries:
+            if not entry.name.endswith(('.xlsx', '.xls', '.csv')) or not entry.is_file():
+                continue
+            
+            # Détecter fichier positions
+            if POSITIONS_FILE_PATTERN.search(entry.name):
+                positions_file = entry.path
             
-        # Détecter fichier ordres
-        if 'ordre' in filename_lower or 'order' in filename_lower:
-            orders_file = filepath
-        elif 'historique' in filename_lower and 'contrat' in filename_lower:
-            orders_file = filepath
+            # Détecter fichier ordres
+            if ORDERS_FILE_PATTERN.search(entry.name):
+                orders_file = entry.path
     
     return positions_file, orders_file
 
@@ -212,32 +215,128 @@ else:
 st.markdown("---")
 
 # ----- PROCESS DATA -----
+def file_signature(file, from_path: bool) -> tuple:
+    """
+    Signature d'un fichier source, utilisée comme clé de cache.
+    
+    Args:
+        file: Chemin (mode automatique) ou fichier uploadé
+        from_path: True si file est un chemin
+    
+    Returns:
+        (chemin, mtime, taille) pour un chemin, (nom, hash du contenu) pour un upload
+    """
+    if from_path:
+        return (file, os.path.getmtime(file), os.path.getsize(file))
+    return (file.name, hashlib.blake2b(file.getvalue()).hexdigest())
+
+
+# À incrémenter quand le pipeline change, pour invalider les caches disque
+PIPELINE_CACHE_VERSION = 8
+
+# Graine du Monte Carlo (résultats reproductibles d'un clic à l'autre)
+MC_SEED = 42
+
+# Colonnes entières réduites au plus petit type suffisant après le pipeline
+# (hour et day_of_week sortent déjà en int8 de normalize_positions)
+DOWNCAST_INT_COLUMNS = ('quantity', 'discipline_score', 'prev_loss_streak', 'cluster')
+
+
+@st.cache_data(show_spinner=False)
+def load_and_prepare(positions_sig: tuple, orders_sig: tuple, _positions_file, _orders_file,
+                     from_path: bool) -> pd.DataFrame:
+    """
+    Pipeline complet: chargement, normalisation, scoring, labels, clustering, types de trade.
+    
+    Mis en cache par Streamlit sur la signature des fichiers: les reruns
+    (filtres, navigation) ne relancent pas le pipeline tant que les fichiers
+    ne changent pas. Les fichiers eux-mêmes (préfixe _) ne sont pas hashés.
+    
+    En mode automatique, le résultat est aussi persisté sur disque
+    (.cache_<hash>.pkl dans le dossier de l'app): un redémarrage relit ce
+    fichier au lieu de re-parser l'Excel et de relancer tout le pipeline.
+    
+    Returns:
+        DataFrame des trades entièrement enrichi
+    """
+    cache_path = None
+    if from_path:
+        cache_key = hashlib.blake2b(
+            repr((PIPELINE_CACHE_VERSION, positions_sig, orders_sig)).encode(), digest_size=16
+        ).hexdigest()
+        cache_path = os.path.join(APP_DIR, f".cache_{cache_key}.pkl")
+        if os.path.exists(cache_path):
+            try:
+                return pd.read_pickle(cache_path)
+            except Exception:
+                # Fichier tronqué ou écrit par une autre version de pandas:
+                # supprimé, le pipeline le reconstruit ci-dessous
+                try:
+                    os.remove(cache_path)
+                except OSError:
+                    pass
+    
+    # Charger et normaliser (chemins locaux ou fichiers uploadés)
+    df = normalize_data(_positions_file, _orders_file)
+    
+    # Import différé (scikit-learn): uniquement quand le pipeline tourne vraiment
+    from ml.clustering import perform_clustering
+    
+    df = calculate_discipline_score(df)
+    df = label_trades(df)
+    df = perform_clustering(df)
+    # perform_clustering renvoie déjà un frame propre au pipeline: pas de copie
+    df = add_trade_type_column(df, inplace=True)
+    
+    # Les colonnes texte à faible cardinalité sortent déjà en catégoriel:
+    # symbol, session, day_name et direction de data_loader, trade_type de
+    # add_trade_type_column (filtres et regroupements sur des codes entiers)
+    
+    # Réduire la largeur des colonnes entières (moins de mémoire à parcourir
+    # dans chaque agrégation). Les flottants restent en float64: en float32,
+    # montants et durées arrondis s'affichent faux (39.900001525878906x).
+    for col in DOWNCAST_INT_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+    
+    if cache_path is not None:
+        _write_pipeline_cache(df, cache_path)
+    return df
+
+
+def _write_pipeline_cache(df: pd.DataFrame, cache_path: str) -> None:
+    """
+    Écrit le cache disque du pipeline de façon atomique.
+    
+    Le pickle est écrit dans un fichier temporaire puis renommé: une
+    interruption ne laisse jamais de .cache_*.pkl tronqué. Les caches des
+    fichiers ou versions précédents sont ensuite supprimés.
+    """
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # Dossier non inscriptible: le cache mémoire suffit
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return
+    
+    for old_path in glob.glob(os.path.join(glob.escape(APP_DIR), '.cache_*.pkl')):
+        if old_path != cache_path:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+
 with st.spinner("🔄 Chargement et normalisation des données..."):
     try:
-        if use_file_path:
-            # Charger depuis les chemins de fichiers
-            import pandas as pd
-            if positions_file.endswith('.csv'):
-                df_pos = pd.read_csv(positions_file)
-            else:
-                df_pos = pd.read_excel(positions_file)
-            
-            if orders_file.endswith('.csv'):
-                df_ord = pd.read_csv(orders_file)
-            else:
-                df_ord = pd.read_excel(orders_file)
-            
-            from data_loader import normalize_positions, enrich_with_orders
-            df = normalize_positions(df_pos)
-            df = enrich_with_orders(df, df_ord)
-            df = df.sort_values('close_time').reset_index(drop=True)
-        else:
-            # Charger depuis les fichiers uploadés
-            df = normalize_data(positions_file, orders_file)
-        
-        df = calculate_discipline_score(df)
-        df = label_trades(df)
-        df = perform_clustering(df)
+        positions_sig = file_signature(positions_file, use_file_path)
+        orders_sig = file_signature(orders_file, use_file_path)
+        df = load_and_prepare(positions_sig, orders_sig, positions_file, orders_file, use_file_path)
     except Exception as e:
         st.error(f"❌ Erreur lors du chargement: {str(e)}")
         import traceback
@@ -247,43 +346,28 @@ with st.spinner("🔄 Chargement et normalisation des données..."):
 st.success(f"✅ {len(df)} trades chargés et analysés")
 st.markdown("---")
 
-# ----- CALCULATE ALL STATS -----
-global_stats = calculate_global_stats(df)
-direction_stats = calculate_direction_stats(df)
-discipline_summary = get_discipline_summary(df)
-insights = generate_all_insights(df, global_stats)
-hourly_stats = calculate_hourly_stats(df)
-session_stats = calculate_session_stats(df)
-daily_stats = calculate_daily_stats(df)
-asset_stats = calculate_asset_stats(df)
-risk_stats = calculate_risk_stats(df)
-leverage_brackets = calculate_leverage_brackets(df)
-behavioral_stats = calculate_behavioral_stats(df)
-duration_stats = calculate_duration_stats(df)
-duration_brackets = calculate_duration_brackets(df)
-execution_stats = calculate_execution_stats(df)
-cluster_profiles = get_cluster_profiles(df)
-
-# Add trade type classification
-df = add_trade_type_column(df)
-trade_type_stats = calculate_trade_type_stats(df)
-trade_type_by_direction = calculate_trade_type_by_direction(df)
+# Trades triés une fois par date de clôture: partagés par le tiltmeter et l'equity curve
+trades_sorted = SortedTrades.from_df(df)
 
 # Calculate Tiltmeter
-tiltmeter = calculate_tiltmeter(df)
-
-# Update Quick Stats in sidebar
-with quick_stats_placeholder:
-    st.metric("Trades", len(df))
-    st.metric("PnL", f"{df['pnl'].sum():.0f}$")
-    st.metric("Win Rate", f"{(df['pnl'] > 0).mean()*100:.0f}%")
+tiltmeter = calculate_tiltmeter(trades_sorted)
+
+# Update Quick Stats in sidebar (un seul bloc HTML au lieu d'un widget par métrique)
+quick_stats_placeholder.markdown(
+    f'<div class="metric-card">'
+    f'Trades: <b>{len(df)}</b><br>'
+    f'PnL: <b>{df["pnl"].sum():.0f}$</b><br>'
+    f'Win Rate: <b>{df["is_win"].mean()*100:.0f}%</b>'
+    f'</div>',
+    unsafe_allow_html=True
+)
 
-# Update Tiltmeter in sidebar
-tiltmeter_placeholder.markdown(f"**{tiltmeter['emoji']} {tiltmeter['score']}/100**")
+# Update Tiltmeter in sidebar (score, statut et alertes dans le même bloc)
+tilt_html = [f"<b>{tiltmeter.get('emoji', '')} {tiltmeter['score']}/100</b>"]
 if tiltmeter['status'] == 'tilt':
-    st.sidebar.error("⚠️ EN TILT!")
-for alert in tiltmeter['alerts'][:2]:
-    st.sidebar.caption(alert)
+    tilt_html.append('<div style="color: #e74c3c;">⚠️ EN TILT!</div>')
+tilt_html.extend(f'<div style="font-size: 0.85em; opacity: 0.7;">{alert}</div>' for alert in tiltmeter['alerts'][:2])
+tiltmeter_placeholder.markdown(''.join(tilt_html), unsafe_allow_html=True)
 
 # Asset filter in sidebar
 all_symbols = sorted(df['symbol'].unique().tolist())
@@ -297,33 +381,68 @@ with asset_filter_placeholder:
     )
 
 # Apply asset filter - if empty means all, if has selection means filter
-if selected_symbols and len(selected_symbols) > 0:
-    df_filtered = df[df['symbol'].isin(selected_symbols)].copy()
+# (masque sur les codes catégoriels; pas de .copy(): les stats ne modifient pas df_filtered)
+if selected_symbols:
+    symbol_codes = df['symbol'].cat.categories.get_indexer(selected_symbols)
+    df_filtered = df[np.isin(df['symbol'].cat.codes.to_numpy(), symbol_codes)]
     st.info(f"🔍 Filtre actif: {', '.join(selected_symbols)} ({len(df_filtered)} trades)")
-    
-    # Recalculate ALL stats with filtered data
-    global_stats = calculate_global_stats(df_filtered)
-    direction_stats = calculate_direction_stats(df_filtered)
-    discipline_summary = get_discipline_summary(df_filtered)
-    insights = generate_all_insights(df_filtered, global_stats)
-    hourly_stats = calculate_hourly_stats(df_filtered)
-    session_stats = calculate_session_stats(df_filtered)
-    daily_stats = calculate_daily_stats(df_filtered)
-    asset_stats = calculate_asset_stats(df_filtered)
-    trade_type_stats = calculate_trade_type_stats(df_filtered)
-    trade_type_by_direction = calculate_trade_type_by_direction(df_filtered)
-    
-    # Also recalculate bottom section stats
-    risk_stats = calculate_risk_stats(df_filtered)
-    leverage_brackets = calculate_leverage_brackets(df_filtered)
-    behavioral_stats = calculate_behavioral_stats(df_filtered)
-    duration_stats = calculate_duration_stats(df_filtered)
-    duration_brackets = calculate_duration_brackets(df_filtered)
-    execution_stats = calculate_execution_stats(df_filtered)
-    cluster_profiles = get_cluster_profiles(df_filtered)
 else:
     df_filtered = df
 
+# ----- CALCULATE ALL STATS -----
+# Une seule passe, sur les données filtrées (ou complètes si aucun filtre).
+# Les calculs sont indépendants et en lecture seule sur df_filtered:
+# exécutés en parallèle (pandas/NumPy relâchent le GIL sur les agrégations).
+# Les résultats sont gardés en session: un rerun qui ne change ni les fichiers
+# ni le filtre (navigation, Monte Carlo...) les réutilise tels quels.
+stats_tasks = {
+    'global_stats': calculate_global_stats,
+    'direction_stats': calculate_direction_stats,
+    'discipline_summary': get_discipline_summary,
+    'hourly_stats': calculate_hourly_stats,
+    'session_stats': calculate_session_stats,
+    'daily_stats': calculate_daily_stats,
+    'asset_stats': calculate_asset_stats,
+    'risk_stats': calculate_risk_stats,
+    'leverage_brackets': calculate_leverage_brackets,
+    'behavioral_stats': calculate_behavioral_stats,
+    'duration_stats': calculate_duration_stats,
+    'duration_brackets': calculate_duration_brackets,
+    'execution_stats': calculate_execution_stats,
+    'cluster_profiles': get_cluster_profiles,
+    'trade_type_stats': calculate_trade_type_stats,
+    'trade_type_by_direction': calculate_trade_type_by_direction,
+}
+
+data_sig = (positions_sig, orders_sig, tuple(selected_symbols))
+if st.session_state.get('last_data_sig') == data_sig:
+    stats_results = st.session_state['stats_results']
+else:
+    with ThreadPoolExecutor(max_workers=min(8, len(stats_tasks))) as executor:
+        futures = {name: executor.submit(fn, df_filtered) for name, fn in stats_tasks.items()}
+        stats_results = {name: future.result() for name, future in futures.items()}
+    stats_results['insights'] = generate_all_insights(df_filtered, stats_results['global_stats'])
+    st.session_state['last_data_sig'] = data_sig
+    st.session_state['stats_results'] = stats_results
+
+global_stats = stats_results['global_stats']
+direction_stats = stats_results['direction_stats']
+discipline_summary = stats_results['discipline_summary']
+hourly_stats = stats_results['hourly_stats']
+session_stats = stats_results['session_stats']
+daily_stats = stats_results['daily_stats']
+asset_stats = stats_results['asset_stats']
+risk_stats = stats_results['risk_stats']
+leverage_brackets = stats_results['leverage_brackets']
+behavioral_stats = stats_results['behavioral_stats']
+duration_stats = stats_results['duration_stats']
+duration_brackets = stats_results['duration_brackets']
+execution_stats = stats_results['execution_stats']
+cluster_profiles = stats_results['cluster_profiles']
+trade_type_stats = stats_results['trade_type_stats']
+trade_type_by_direction = stats_results['trade_type_by_direction']
+insights = stats_results['insights']
+
 try:
     trade_dna = extract_trade_dna(df_filtered)
     dna_recommendations = get_dna_recommendations(trade_dna, df_filtered)
@@ -357,10 +476,22 @@ st.markdown("---")
 st.markdown('<div id="equity"></div>', unsafe_allow_html=True)
 st.header("📈 Equity Curve")
 
-# Generate equity curve data
-equity_data = generate_equity_curve_data(df)
-if len(equity_data) > 0:
-    # Create static chart with matplotlib (no zoom interaction)
+@st.cache_data(show_spinner=False)
+def render_equity_chart(close_times: np.ndarray, cumulative_pnl: np.ndarray) -> bytes:
+    """
+    Dessine l'equity curve (matplotlib, statique) et renvoie le PNG.
+    
+    Mis en cache sur les données: un rerun sans changement de données
+    réutilise l'image au lieu de redessiner la figure.
+    
+    Args:
+        close_times: Dates de clôture des trades
+        cumulative_pnl: PnL cumulé correspondant
+    
+    Returns:
+        Image PNG (bytes)
+    """
+    import io
     import matplotlib.pyplot as plt
     import matplotlib.dates as mdates
     
@@ -369,12 +500,10 @@ if len(equity_data) > 0:
     ax.set_facecolor('#0e1117')
     
     # Plot cumulative PnL
-    ax.plot(equity_data['close_time'], equity_data['cumulative_pnl'], 
-            color='#00d4aa', linewidth=2, label='PnL Cumulé')
+    ax.plot(close_times, cumulative_pnl, color='#00d4aa', linewidth=2, label='PnL Cumulé')
     
     # Fill area under curve
-    ax.fill_between(equity_data['close_time'], equity_data['cumulative_pnl'], 
-                    alpha=0.3, color='#00d4aa')
+    ax.fill_between(close_times, cumulative_pnl, alpha=0.3, color='#00d4aa')
     
     # Add zero line
     ax.axhline(y=0, color='#666', linestyle='--', linewidth=0.5)
@@ -390,22 +519,32 @@ if len(equity_data) > 0:
     ax.grid(True, alpha=0.2, color='#444')
     
     plt.tight_layout()
-    st.pyplot(fig, width='stretch')
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=200, bbox_inches='tight', facecolor=fig.get_facecolor())
     plt.close(fig)
+    return buf.getvalue()
+
+
+# Generate equity curve data
+close_times, cumulative, pnl_values, drawdown = generate_equity_and_drawdown(trades_sorted)
+if len(cumulative) > 0:
+    # Create static chart with matplotlib (no zoom interaction)
+    st.image(render_equity_chart(close_times, cumulative), width='stretch')
+    
+    # Show key stats (drawdown issu de la même passe que le PnL cumulé)
+    peak = cumulative.max()
+    final = cumulative[-1]
+    dd = drawdown.min()
+    best_trade = pnl_values.max()
     
-    # Show key stats
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        peak = equity_data['cumulative_pnl'].max()
         st.metric("🔝 Peak", f"{peak:.2f}$")
     with col2:
-        final = equity_data['cumulative_pnl'].iloc[-1]
         st.metric("🏁 Final", f"{final:.2f}$")
     with col3:
-        dd = (equity_data['cumulative_pnl'] - equity_data['cumulative_pnl'].cummax()).min()
         st.metric("📉 Max Drawdown", f"{dd:.2f}$")
     with col4:
-        best_trade = equity_data['pnl'].max()
         st.metric("🎯 Meilleur Trade", f"+{best_trade:.2f}$")
 
 st.markdown("---")
@@ -443,40 +582,49 @@ if len(calendar_data) > 0:
     # Calculate max PnL for color scaling
     max_abs_pnl = calendar_data['pnl'].abs().max() if len(calendar_data) > 0 else 1
     
-    # Build calendar with Streamlit columns instead of HTML
-    import calendar as cal
-    calendar_obj = cal.Calendar(firstweekday=0)
-    
-    # Create dict for quick lookup
-    day_data = month_data.set_index('day').to_dict('index')
+    # Build calendar as a single HTML table (one render instead of one widget per day)
+    scale = max_abs_pnl if max_abs_pnl > 0 else 1
     
     # Header row
     day_names = ['Lun', 'Mar', 'Mer', 'Jeu', 'Ven', 'Sam', 'Dim']
-    header_cols = st.columns(7)
-    for i, day_name in enumerate(day_names):
-        header_cols[i].markdown(f"**{day_name}**")
+    html = ['<table style="width:100%; table-layout:fixed; border-collapse:separate; border-spacing:4px; text-align:center;">',
+            '<tr>', *(f'<th>{day_name}</th>' for day_name in day_names), '</tr>']
+    
+    # Teinte et opacité calculées d'un coup pour tous les jours du mois
+    # (tableaux indexés par numéro de jour), lues ensuite case par case
+    # (intensité de couleur proportionnelle au |PnL| du jour)
+    days = month_data['day'].to_numpy()
+    month_pnl = month_data['pnl'].to_numpy(dtype=np.float64)
+    hue_by_day = np.zeros(32, dtype=np.int64)
+    alpha_by_day = np.zeros(32)
+    hue_by_day[days] = np.where(month_pnl > 0, 145, 6)
+    alpha_by_day[days] = 0.15 + 0.75 * np.minimum(np.abs(month_pnl) / scale, 1)
+    hue_by_day = hue_by_day.tolist()
+    alpha_by_day = alpha_by_day.tolist()
     
     # Calendar weeks
-    for week in calendar_obj.monthdayscalendar(selected_year, selected_month):
-        week_cols = st.columns(7)
-        for i, day in enumerate(week):
-            if day == 0:
-                week_cols[i].markdown("")
+    for week in get_monthly_calendar_matrix(month_data, selected_year, selected_month):
+        html.append('<tr>')
+        for info in week:
+            if info is None:
+                html.append('<td></td>')
+                continue
+            day = info['day']
+            trades = int(info['nb_trades'])
+            if trades > 0:
+                pnl = info['pnl']
+                hue = hue_by_day[day]
+                alpha = alpha_by_day[day]
+                pnl_str = f"+{pnl:.1f}$" if pnl > 0 else f"{pnl:.1f}$"
+                html.append(
+                    f'<td style="background:hsla({hue}, 63%, 49%, {alpha:.2f}); border-radius:6px; padding:6px;">'
+                    f'<b>{day}</b><br>{pnl_str}<br><i>{trades} trades</i></td>'
+                )
             else:
-                info = day_data.get(day, {})
-                pnl = info.get('pnl', 0)
-                trades = info.get('nb_trades', 0)
-                
-                if trades > 0:
-                    if pnl > 0:
-                        emoji = "🟢"
-                        pnl_str = f"+{pnl:.1f}$"
-                    else:
-                        emoji = "🔴"
-                        pnl_str = f"{pnl:.1f}$"
-                    week_cols[i].markdown(f"{emoji} **{day}**  \n{pnl_str}  \n_{trades} trades_")
-                else:
-                    week_cols[i].markdown(f"**{day}**")
+                html.append(f'<td style="padding:6px;"><b>{day}</b></td>')
+        html.append('</tr>')
+    html.append('</table>')
+    st.markdown(''.join(html), unsafe_allow_html=True)
     
     # Monthly summary
     st.markdown("---")
@@ -532,8 +680,7 @@ tab1, tab2, tab3 = st.tabs(["Par Heure", "Par Session", "Par Jour"])
 with tab1:
     if len(hourly_stats) > 0:
         st.dataframe(hourly_stats, width='stretch', hide_index=True)
-        toxic = get_toxic_hours(hourly_stats)
-        profitable = get_profitable_hours(hourly_stats)
+        profitable, toxic = partition_hours(hourly_stats)
         if toxic:
             st.error(f"🚫 Heures toxiques: {', '.join(f'{h}h' for h in toxic[:5])}")
         if profitable:
@@ -712,9 +859,22 @@ st.markdown("---")
 st.markdown('<div id="montecarlo"></div>', unsafe_allow_html=True)
 st.header("🔬 13. Analyse Avancée (Monte Carlo)")
 
+@st.cache_data(show_spinner=False)
+def run_monte_carlo(pnl_hash: str, n_simulations: int, seed: int, _df: pd.DataFrame) -> dict:
+    """
+    Monte Carlo mis en cache sur le hash du vecteur de PnL (+ paramètres).
+    
+    Avec une graine fixe le résultat est déterministe: un nouveau clic
+    sur les mêmes données ne relance pas les simulations.
+    """
+    from stats.robustness import monte_carlo_simulation
+    return monte_carlo_simulation(_df, n_simulations=n_simulations, seed=seed)
+
+
 if st.button("🚀 Lancer l'analyse Monte Carlo", type="primary"):
     with st.spinner("⏳ Simulation en cours (1000 itérations)..."):
-        mc_stats = monte_carlo_simulation(df, n_simulations=1000)
+        pnl_hash = hashlib.blake2b(df['pnl'].to_numpy().tobytes()).hexdigest()
+        mc_stats = run_monte_carlo(pnl_hash, 1000, MC_SEED, df)
     
     st.success("✅ Simulation terminée")
     
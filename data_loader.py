@@ -11,24 +11,52 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Tuple, Optional
+import importlib.util
+import os
+import re
+from pandas.api.types import union_categoricals
+
+# Lecteurs rapides optionnels, détectés une fois à l'import
+# (calamine via pandas nécessite pandas >= 2.2)
+_HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+_HAS_CALAMINE = (
+    importlib.util.find_spec('python_calamine') is not None
+    and tuple(int(v) for v in pd.__version__.split('.')[:2]) >= (2, 2)
+)
+
+# Au-delà de cette taille, les CSV de positions sont lus et normalisés par blocs
+# (pic mémoire ~ un bloc brut au lieu du fichier brut entier + sa version normalisée)
+CHUNKED_CSV_MIN_BYTES = 50 * 1024 * 1024
+CSV_CHUNKSIZE = 100_000
 
 
 def load_file(file) -> pd.DataFrame:
     """
-    Charge un fichier CSV ou XLSX uploadé via Streamlit.
+    Charge un fichier CSV ou XLSX (uploadé via Streamlit ou chemin local).
+    
+    Utilise les lecteurs rapides s'ils sont installés: moteur pyarrow
+    (multi-thread) pour les CSV, calamine (Rust) pour les Excel.
     
     Args:
-        file: Fichier uploadé (UploadedFile de Streamlit)
+        file: Fichier uploadé (UploadedFile de Streamlit) ou chemin
     
     Returns:
         DataFrame pandas avec les données brutes
     """
-    if file.name.endswith('.csv'):
+    name = file if isinstance(file, str) else file.name
+    if name.endswith('.csv'):
+        if _HAS_PYARROW:
+            try:
+                return pd.read_csv(file, engine='pyarrow')
+            except Exception:
+                # Repli sur le moteur C (options/format non gérés par pyarrow)
+                if hasattr(file, 'seek'):
+                    file.seek(0)
         return pd.read_csv(file)
-    elif file.name.endswith(('.xlsx', '.xls')):
-        return pd.read_excel(file)
+    elif name.endswith(('.xlsx', '.xls')):
+        return pd.read_excel(file, engine='calamine' if _HAS_CALAMINE else None)
     else:
-        raise ValueError(f"Format non supporté: {file.name}. Utilisez CSV ou XLSX.")
+        raise ValueError(f"Format non supporté: {name}. Utilisez CSV ou XLSX.")
 
 
 def get_session(hour: int) -> str:
@@ -63,6 +91,150 @@ def get_day_name(day_num: int) -> str:
     return days[day_num]
 
 
+# Tables de correspondance précalculées (index = heure 0-23 / jour 0-6):
+# un take() remplace l'appel Python par ligne et produit directement
+# une colonne catégorielle (jours ordonnés du lundi au dimanche)
+_SESSION_BY_HOUR = pd.Categorical([get_session(hour) for hour in range(24)])
+_DAY_NAMES = pd.Categorical([get_day_name(day) for day in range(7)],
+                            categories=[get_day_name(day) for day in range(7)], ordered=True)
+
+
+# Formats de date candidats, le premier étant celui des exports MEXC.
+# Dates avec barres: mois en premier (comme pd.to_datetime sans format);
+# le jour en premier n'est retenu que si un jour > 12 l'impose
+_DATETIME_FORMATS = (
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S',
+    '%m/%d/%Y %H:%M:%S',
+    '%m/%d/%Y %H:%M',
+    '%d/%m/%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M',
+    '%d-%b-%Y',
+)
+
+
+def detect_datetime_format(series: pd.Series, n: int = 100) -> Optional[str]:
+    """
+    Détecte le format d'une colonne de dates texte à partir d'un échantillon.
+    
+    Args:
+        series: Colonne de dates (texte)
+        n: Taille de l'échantillon (valeurs non nulles)
+    
+    Returns:
+        Format strftime reconnu, ou None si aucun candidat ne convient
+    """
+    sample = series.dropna().head(n).astype(str)
+    if sample.empty:
+        return None
+    
+    for fmt in _DATETIME_FORMATS:
+        try:
+            pd.to_datetime(sample, format=fmt)
+            return fmt
+        except (ValueError, TypeError):
+            continue
+    return None
+
+
+def _to_datetime(series: pd.Series) -> pd.Series:
+    """
+    Convertit une colonne de dates avec un format explicite quand il est détectable.
+    
+    Un format connu évite l'inférence élément par élément; sinon les
+    variantes ISO 8601 passent par le parseur ISO natif (C) de pandas, et
+    seul le reste se replie sur format='mixed' (même comportement que sans format).
+    
+    Le résultat est toujours en nanosecondes: dates déjà typées (moteur
+    pyarrow: secondes) ou parsées (pandas 3: microsecondes) donnent le même
+    dtype, quels que soient la taille du fichier et le lecteur utilisé.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.as_unit('ns')
+    
+    fmt = detect_datetime_format(series)
+    if fmt is not None:
+        try:
+            return pd.to_datetime(series, format=fmt, cache=True).dt.as_unit('ns')
+        except ValueError:
+            pass  # Format valable sur l'échantillon seulement
+    try:
+        parsed = pd.to_datetime(series, format='ISO8601', cache=True)
+    except ValueError:
+        parsed = pd.to_datetime(series, format='mixed', cache=True)
+    return parsed.dt.as_unit('ns')
+
+
+def _to_number(series: pd.Series) -> pd.Series:
+    """
+    Convertit une colonne de montants MEXC en float, de façon vectorisée.
+    
+    Gère le suffixe "USDT" et la virgule décimale; les valeurs
+    manquantes ou illisibles valent 0.
+    
+    Args:
+        series: Colonne brute (nombres ou textes)
+    
+    Returns:
+        Série float64
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(np.float64).fillna(0.0)
+    
+    cleaned = (
+        series.astype(str)
+        .str.upper()
+        .str.replace('USDT', '', regex=False)
+        .str.replace(',', '.', regex=False)
+        .str.strip()
+    )
+    return pd.to_numeric(cleaned, errors='coerce').fillna(0.0).astype(np.float64)
+
+
+# Levier numérique dans les libellés MEXC (ex: "50x" -> 50), compilé une fois
+_LEVERAGE_RE = re.compile(r'(\d+)')
+
+
+def _extract_leverage(series: pd.Series) -> pd.Series:
+    """Extrait le levier numérique (float, NaN si absent) d'une colonne d'ordres."""
+    return series.astype(str).str.extract(_LEVERAGE_RE, expand=False).astype(np.float64)
+
+
+# Libellés de direction MEXC (après mise en majuscules) -> direction normalisée
+_DIRECTION_ALIASES = {
+    'OPEN LONG': 'LONG',
+    'OPEN SHORT': 'SHORT',
+    'CLOSE LONG': 'LONG',
+    'CLOSE SHORT': 'SHORT',
+}
+
+
+def _normalize_direction(series: pd.Series) -> pd.Series:
+    """
+    Normalise la colonne direction (LONG/SHORT) en catégoriel.
+    
+    Le nettoyage (majuscules, espaces, alias) ne porte que sur les quelques
+    libellés distincts; les lignes sont ensuite remappées via leurs codes.
+    
+    Args:
+        series: Colonne direction brute
+    
+    Returns:
+        Série catégorielle normalisée
+    """
+    raw = series.astype('category')
+    labels = raw.cat.categories
+    cleaned = pd.Series(labels.astype(str)).str.upper().str.strip().replace(_DIRECTION_ALIASES)
+    return raw.map(dict(zip(labels, cleaned))).astype('category')
+
+
+# Colonnes produites par normalize_positions: leur présence signale un frame déjà normalisé
+_NORMALIZED_COLUMNS = frozenset({
+    'symbol', 'open_time', 'close_time', 'duration_minutes',
+    'hour', 'session', 'is_win', 'pnl', 'pnl_gross',
+})
+
+
 def normalize_positions(df_positions: pd.DataFrame) -> pd.DataFrame:
     """
     Normalise le fichier d'historique des positions MEXC.
@@ -75,7 +247,10 @@ def normalize_positions(df_positions: pd.DataFrame) -> pd.DataFrame:
     Returns:
         DataFrame normalisé avec colonnes standardisées
     """
-    df = df_positions.copy()
+    # Frame déjà normalisé (ex: rerun sur des données en cache): rien à recalculer
+    if (_NORMALIZED_COLUMNS.issubset(df_positions.columns)
+            and pd.api.types.is_datetime64_any_dtype(df_positions['open_time'])):
+        return df_positions.copy(deep=False)
     
     # Mapping des colonnes MEXC -> colonnes normalisées
     column_mapping = {
@@ -92,55 +267,87 @@ def normalize_positions(df_positions: pd.DataFrame) -> pd.DataFrame:
         'UID': 'uid'
     }
     
-    # Renommer les colonnes existantes
-    df = df.rename(columns={k: v for k, v in column_mapping.items() if k in df.columns})
+    # Renommer les colonnes existantes (nouveau frame: l'entrée n'est pas modifiée)
+    df = df_positions.rename(columns={k: v for k, v in column_mapping.items() if k in df_positions.columns})
+    
+    # Chaque colonne dérivée est calculée séparément (tableaux NumPy),
+    # puis le frame est assemblé une seule fois à la fin
     
     # Convertir les dates
-    df['open_time'] = pd.to_datetime(df['open_time'])
-    df['close_time'] = pd.to_datetime(df['close_time'])
+    open_time = _to_datetime(df['open_time'])
+    close_time = _to_datetime(df['close_time'])
     
     # Calculer la durée en minutes
-    df['duration_minutes'] = (df['close_time'] - df['open_time']).dt.total_seconds() / 60
+    duration_minutes = (close_time - open_time).dt.total_seconds().to_numpy() / 60
+    
+    # Heure et jour de la semaine en un seul passage sur les secondes depuis
+    # l'epoch (heure locale affichée si la colonne porte un fuseau)
+    wall_time = close_time.dt.tz_localize(None) if close_time.dt.tz is not None else close_time
+    wall_seconds = wall_time.to_numpy().astype('datetime64[s]')
+    
+    # Une date de clôture absente (NaT) donnerait une heure et un jour
+    # inventés: erreur explicite plutôt que des statistiques fausses
+    missing = np.isnat(wall_seconds)
+    if missing.any():
+        rows = df.index[missing][:5].tolist()
+        raise ValueError(
+            f"Date de clôture manquante ou illisible pour {int(missing.sum())} position(s) "
+            f"(lignes {rows})."
+        )
+    days, seconds_of_day = np.divmod(wall_seconds.astype(np.int64), 86400)
     
     # Extraire l'heure (0-23) basée sur close_time
-    df['hour'] = df['close_time'].dt.hour
-    
-    # Extraire le jour de la semaine (0=Lundi, 6=Dimanche)
-    df['day_of_week'] = df['close_time'].dt.dayofweek
-    df['day_name'] = df['day_of_week'].apply(get_day_name)
+    # (int8 suffit: 8x moins de mémoire à parcourir dans les regroupements)
+    hour = (seconds_of_day // 3600).astype(np.int8)
     
-    # Déterminer la session
-    df['session'] = df['hour'].apply(get_session)
+    # Extraire le jour de la semaine (0=Lundi, 6=Dimanche; le 01/01/1970 était un jeudi)
+    day_of_week = ((days + 3) % 7).astype(np.int8)
     
     # Normaliser la direction
-    df['direction'] = df['direction'].str.upper().str.strip()
-    df['direction'] = df['direction'].replace({
-        'OPEN LONG': 'LONG',
-        'OPEN SHORT': 'SHORT',
-        'CLOSE LONG': 'LONG',
-        'CLOSE SHORT': 'SHORT'
-    })
+    direction = _normalize_direction(df['direction'])
     
     # S'assurer que pnl est numérique (enlever le suffixe USDT si présent)
-    def clean_numeric(val):
-        if pd.isna(val):
-            return 0
-        val_str = str(val).upper().replace('USDT', '').replace(',', '.').strip()
-        try:
-            return float(val_str)
-        except:
-            return 0
+    pnl = _to_number(df['pnl']).to_numpy()
+    fees = _to_number(df['fees']).to_numpy()
+    
+    return df.assign(
+        # Clés de regroupement à faible cardinalité stockées en catégoriel
+        symbol=df['symbol'].astype('category'),
+        open_time=open_time,
+        close_time=close_time,
+        # Catégoriel: les comparaisons/regroupements se font sur des codes entiers
+        direction=direction,
+        fees=fees,
+        pnl=pnl,
+        duration_minutes=duration_minutes,
+        hour=hour,
+        day_of_week=day_of_week,
+        day_name=_DAY_NAMES.take(day_of_week),
+        # Déterminer la session
+        session=_SESSION_BY_HOUR.take(hour),
+        # Calculer PnL brut (avant fees)
+        pnl_gross=pnl + np.abs(fees),
+        # Flag trade gagnant
+        is_win=pnl > 0,
+    )
+
+
+def _leverage_by_symbol(df_orders: pd.DataFrame) -> dict:
+    """
+    Calcule le levier moyen par symbol à partir du frame brut des ordres.
     
-    df['pnl'] = df['pnl'].apply(clean_numeric)
-    df['fees'] = df['fees'].apply(clean_numeric)
+    Returns:
+        Dict symbol -> levier moyen (vide si la colonne de levier est absente)
+    """
+    if 'Effet de levier' not in df_orders.columns:
+        return {}
     
-    # Calculer PnL brut (avant fees)
-    df['pnl_gross'] = df['pnl'] + abs(df['fees'])
+    symbol = df_orders.get('Paire de contrats à terme', df_orders.get('Futures', '')).str.strip()
     
-    # Flag trade gagnant
-    df['is_win'] = df['pnl'] > 0
+    # Extraire le levier numérique (ex: "50x" -> 50)
+    leverage = _extract_leverage(df_orders['Effet de levier'])
     
-    return df
+    return leverage.groupby(symbol).mean().to_dict()
 
 
 def enrich_with_orders(df_positions: pd.DataFrame, df_orders: pd.DataFrame) -> pd.DataFrame:
@@ -154,52 +361,56 @@ def enrich_with_orders(df_positions: pd.DataFrame, df_orders: pd.DataFrame) -> p
     Returns:
         DataFrame enrichi avec levier et type d'ordre
     """
-    df = df_positions.copy()
+    # Copie superficielle: seules des colonnes sont ajoutées, l'entrée reste intacte
+    df = df_positions.copy(deep=False)
     
     # Extraire les informations de levier des ordres
     if 'Effet de levier' in df_orders.columns:
-        # Créer un mapping symbol -> levier moyen
-        orders_copy = df_orders.copy()
-        orders_copy['symbol'] = orders_copy.get('Paire de contrats à terme', 
-                                                 orders_copy.get('Futures', '')).str.strip()
-        
-        # Extraire le levier numérique (ex: "50x" -> 50)
-        orders_copy['leverage'] = orders_copy['Effet de levier'].astype(str).str.extract(r'(\d+)').astype(float)
-        
-        # Calculer le levier moyen par symbol
-        leverage_by_symbol = orders_copy.groupby('symbol')['leverage'].mean().to_dict()
-        
-        # Appliquer aux positions
-        df['leverage'] = df['symbol'].map(leverage_by_symbol).fillna(1)
+        # Appliquer le levier moyen par symbol aux positions
+        df['leverage'] = df['symbol'].map(_leverage_by_symbol(df_orders)).astype(np.float64).fillna(1)
     else:
         df['leverage'] = 1
     
-    # Extraire le type d'ordre
-    if "Type d'ordre" in df_orders.columns:
-        # Compter le type d'ordre dominant par symbol
-        orders_copy = df_orders.copy()
-        orders_copy['symbol'] = orders_copy.get('Paire de contrats à terme',
-                                                 orders_copy.get('Futures', '')).str.strip()
-        orders_copy['order_type'] = orders_copy["Type d'ordre"].str.upper()
-        
-        # Mapper MARKET ou LIMIT
-        def classify_order_type(order_type):
-            if pd.isna(order_type):
-                return 'UNKNOWN'
-            order_type = str(order_type).upper()
-            if 'MARKET' in order_type:
-                return 'MARKET'
-            elif 'LIMIT' in order_type:
-                return 'LIMIT'
-            return 'OTHER'
-        
-        orders_copy['order_type_clean'] = orders_copy['order_type'].apply(classify_order_type)
-        
-        # On ne peut pas directement mapper les ordres aux positions
-        # On met un placeholder pour l'instant
-        df['order_type'] = 'UNKNOWN'
-    else:
-        df['order_type'] = 'UNKNOWN'
+    # Type d'ordre: les ordres ne peuvent pas encore être rattachés aux positions,
+    # placeholder pour l'instant (aucune classification des ordres n'est donc calculée)
+    df['order_type'] = 'UNKNOWN'
+    
+    return df
+
+
+def _file_size(file) -> int:
+    """Taille en octets d'un chemin local ou d'un UploadedFile Streamlit (0 si inconnue)."""
+    if isinstance(file, str):
+        return os.path.getsize(file)
+    return getattr(file, 'size', 0) or 0
+
+
+def _normalize_positions_chunked(file, chunksize: int = CSV_CHUNKSIZE) -> pd.DataFrame:
+    """
+    Lit et normalise un gros CSV de positions bloc par bloc.
+    
+    Chaque bloc brut est normalisé puis libéré: le fichier brut complet
+    n'est jamais chargé en même temps que le frame normalisé.
+    
+    Args:
+        file: Chemin ou fichier uploadé (CSV)
+        chunksize: Nombre de lignes par bloc
+    
+    Returns:
+        DataFrame normalisé (même résultat que normalize_positions(load_file(file)))
+    """
+    chunks = [normalize_positions(chunk) for chunk in pd.read_csv(file, chunksize=chunksize)]
+    df = pd.concat(chunks, ignore_index=True)
+    
+    # concat repasse en object les catégoriels dont les catégories diffèrent
+    # d'un bloc à l'autre (symbol, direction): union des catégories.
+    # Les catégoriels ordonnés (day_name) ont des catégories fixes, communes
+    # à tous les blocs: concat les conserve déjà, et union_categoricals
+    # refuse de les trier.
+    for col in chunks[0].select_dtypes('category').columns:
+        if chunks[0][col].cat.ordered:
+            continue
+        df[col] = union_categoricals([chunk[col] for chunk in chunks], sort_categories=True)
     
     return df
 
@@ -215,35 +426,34 @@ def normalize_data(positions_file, orders_file) -> pd.DataFrame:
     Returns:
         DataFrame normalisé et enrichi prêt pour l'analyse
     """
-    # Charger les fichiers
-    df_positions = load_file(positions_file)
-    df_orders = load_file(orders_file)
+    # Charger et normaliser les positions (par blocs pour les très gros CSV)
+    name = positions_file if isinstance(positions_file, str) else positions_file.name
+    if name.endswith('.csv') and _file_size(positions_file) > CHUNKED_CSV_MIN_BYTES:
+        df = _normalize_positions_chunked(positions_file)
+    else:
+        df = normalize_positions(load_file(positions_file))
     
-    # Normaliser les positions
-    df = normalize_positions(df_positions)
+    df_orders = load_file(orders_file)
     
     # Enrichir avec les ordres
     df = enrich_with_orders(df, df_orders)
     
-    # Trier par date de clôture
-    df = df.sort_values('close_time').reset_index(drop=True)
+    # Trier par date de clôture (argsort stable + take: une seule réindexation)
+    df = df.take(np.argsort(df['close_time'].to_numpy(), kind='stable')).reset_index(drop=True)
     
     return df
 
 
-def get_leverage_from_orders(orders_file) -> dict:
+def get_leverage_from_orders(orders) -> dict:
     """
     Extrait le levier par trade depuis le fichier d'ordres.
     
+    Args:
+        orders: Fichier d'ordres, ou DataFrame des ordres déjà chargé
+            (évite de relire et reparser le fichier)
+    
     Returns:
         Dict avec symbol -> leverage moyen
     """
-    df = load_file(orders_file)
-    
-    if 'Effet de levier' not in df.columns:
-        return {}
-    
-    df['symbol'] = df.get('Paire de contrats à terme', df.get('Futures', '')).str.strip()
-    df['leverage'] = df['Effet de levier'].astype(str).str.extract(r'(\d+)').astype(float)
-    
-    return df.groupby('symbol')['leverage'].mean().to_dict()
+    df = orders if isinstance(orders, pd.DataFrame) else load_file(orders)
+    return _leverage_by_symbol(df)
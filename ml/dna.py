@@ -58,8 +58,8 @@ def extract_trade_dna(df: pd.DataFrame) -> dict:
         # Performance
         'winrate': (dna_trades['is_win'].sum() / len(dna_trades)) * 100,
         
-        # Actifs favoris
-        'top_symbols': dna_trades['symbol'].value_counts().head(3).to_dict()
+        # Actifs favoris (symbol catégoriel: ignorer les actifs sans trade)
+        'top_symbols': dna_trades['symbol'].value_counts().head(3).loc[lambda c: c > 0].to_dict()
     }
     
     return dna
@@ -9,6 +9,8 @@ Score plancher: 0
 import pandas as pd
 import numpy as np
 
+from stats._kernels import prev_loss_streaks
+
 
 def calculate_discipline_score(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -26,7 +28,8 @@ def calculate_discipline_score(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         DataFrame avec colonne 'discipline_score' ajoutée
     """
-    df = df.copy()
+    # Copie superficielle: les colonnes modifiées sont créées ici, l'entrée reste intacte
+    df = df.copy(deep=False)
     
     # Score initial
     df['discipline_score'] = 100
@@ -39,25 +42,21 @@ def calculate_discipline_score(df: pd.DataFrame) -> pd.DataFrame:
     
     # --- Pénalité 2: Trade après séquence de pertes ---
     # Calculer le nombre de pertes consécutives avant chaque trade
-    df['prev_loss_streak'] = 0
-    loss_streak = 0
-    streaks = []
-    
-    for idx, row in df.iterrows():
-        streaks.append(loss_streak)
-        if not row['is_win']:
-            loss_streak += 1
-        else:
-            loss_streak = 0
-    
-    df['prev_loss_streak'] = streaks
+    # (perte = pnl < 0, même définition que les stats: un trade à 0 coupe la série)
+    df['prev_loss_streak'] = prev_loss_streaks(df['pnl'].to_numpy(dtype=np.float64) < 0)
     # Pénalité revenge trading (après 5+ pertes consécutives)
     mask_revenge = df['prev_loss_streak'] >= 5
     df.loc[mask_revenge, 'discipline_score'] -= 20
     
     # --- Pénalité 3: Trade trop rapide après le précédent ---
-    df['time_since_prev'] = df['open_time'].diff().dt.total_seconds() / 60
-    mask_impulse = df['time_since_prev'] < 5
+    # Écart en minutes calculé directement sur le tableau datetime64 (NaN au premier trade)
+    open_time = df['open_time']
+    if open_time.dt.tz is not None:
+        open_time = open_time.dt.tz_convert(None)
+    time_since_prev = np.full(len(df), np.nan)
+    time_since_prev[1:] = np.diff(open_time.to_numpy()) / np.timedelta64(1, 'm')
+    df['time_since_prev'] = time_since_prev
+    mask_impulse = time_since_prev < 5
     df.loc[mask_impulse, 'discipline_score'] -= 10
     
     # Score plancher à 0
@@ -81,7 +80,8 @@ def label_trades(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         DataFrame avec colonne 'trade_label' ajoutée
     """
-    df = df.copy()
+    # Copie superficielle: seules des colonnes sont ajoutées
+    df = df.copy(deep=False)
     
     conditions = [
         df['discipline_score'] < 40,
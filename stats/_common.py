@@ -0,0 +1,67 @@
+"""
+stats/_common.py - Utilitaires partagés entre modules de stats
+"""
+
+from functools import wraps
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+
+def requires_columns(*columns: str, empty=dict):
+    """
+    Décorateur de garde pour les fonctions de stats prenant un DataFrame en premier argument.
+    
+    Si le DataFrame est vide ou qu'une des colonnes requises manque, la fonction
+    n'est pas appelée et un résultat vide est renvoyé.
+    
+    Args:
+        columns: Colonnes requises (aucune: seul le DataFrame vide est filtré)
+        empty: Fabrique du résultat vide (dict ou pd.DataFrame), appelée à chaque fois
+    """
+    required = frozenset(columns)
+    
+    def decorator(func):
+        @wraps(func)
+        def wrapper(df: pd.DataFrame, *args, **kwargs):
+            if len(df) == 0 or not required.issubset(df.columns):
+                return empty()
+            return func(df, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class SortedTrades(NamedTuple):
+    """
+    Colonnes des trades triées une seule fois par date de clôture (tri stable).
+    
+    Partagées entre equity curve, drawdown et tiltmeter au lieu d'un tri
+    (et d'une copie du DataFrame) par fonction.
+    """
+    close_time: np.ndarray  # datetime64, heure locale sans fuseau
+    pnl: np.ndarray  # float64
+    
+    @classmethod
+    def from_df(cls, df: pd.DataFrame) -> 'SortedTrades':
+        """Trie close_time et pnl par date de clôture (ordre d'origine conservé à égalité)."""
+        if len(df) == 0:
+            return cls(np.array([], dtype='datetime64[ns]'), np.array([]))
+        
+        close_time = df['close_time']
+        if getattr(close_time.dt, 'tz', None) is not None:
+            close_time = close_time.dt.tz_localize(None)
+        close_time = close_time.to_numpy()
+        order = np.argsort(close_time, kind='stable')
+        
+        return cls(close_time[order], df['pnl'].to_numpy(dtype=np.float64)[order])
+
+
+def sorted_trades(trades) -> SortedTrades:
+    """
+    Renvoie la vue triée des trades, calculée si on reçoit un DataFrame.
+    
+    Args:
+        trades: DataFrame des trades ou SortedTrades déjà calculé
+    """
+    return trades if isinstance(trades, SortedTrades) else SortedTrades.from_df(trades)
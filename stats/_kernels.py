@@ -0,0 +1,156 @@
+"""
+stats/_kernels.py - Noyaux de calcul partagés entre modules de stats
+
+Fonctions pures sur tableaux NumPy (pas de DataFrame).
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+
+class PnlAggregates(NamedTuple):
+    """Agrégats gains/pertes d'une suite de PnL (voir pnl_aggregates)."""
+    wins_mask: np.ndarray
+    losses_mask: np.ndarray
+    gains_sum: float
+    losses_sum: float
+    n_wins: int
+    n_losses: int
+    avg_win: float
+    avg_loss: float
+
+
+def pnl_aggregates(pnl: np.ndarray) -> PnlAggregates:
+    """
+    Calcule en une fois les masques et agrégats gains/pertes d'une suite de PnL.
+    
+    Args:
+        pnl: Tableau des PnL
+    
+    Returns:
+        PnlAggregates (losses_sum et avg_loss en valeur absolue, 0 si aucun trade concerné)
+    """
+    wins_mask = pnl > 0
+    losses_mask = pnl < 0
+    n_wins = int(np.count_nonzero(wins_mask))
+    n_losses = int(np.count_nonzero(losses_mask))
+    # Sommes conditionnelles sans sélection: les trades hors du signe valent 0
+    gains_sum = np.maximum(pnl, 0).sum()
+    losses_sum = abs(np.minimum(pnl, 0).sum())
+    
+    return PnlAggregates(
+        wins_mask=wins_mask,
+        losses_mask=losses_mask,
+        gains_sum=gains_sum,
+        losses_sum=losses_sum,
+        n_wins=n_wins,
+        n_losses=n_losses,
+        avg_win=gains_sum / n_wins if n_wins > 0 else 0,
+        avg_loss=losses_sum / n_losses if n_losses > 0 else 0,
+    )
+
+
+def max_streaks(pnl: np.ndarray) -> tuple:
+    """
+    Calcule les séquences maximales de gains et pertes d'une suite de PnL.
+    
+    Encodage par plages (run-length): signe de chaque trade (+1 gain,
+    -1 perte, 0 sinon ou NaN), puis longueur de chaque plage de signe constant.
+    
+    Args:
+        pnl: Tableau des PnL dans l'ordre chronologique
+    
+    Returns:
+        (max_win_streak, max_loss_streak)
+    """
+    sign = (pnl > 0).astype(np.int8) - (pnl < 0)
+    starts = np.r_[0, np.flatnonzero(np.diff(sign)) + 1]
+    lengths = np.diff(np.r_[starts, len(sign)])
+    run_sign = sign[starts]
+    
+    max_win = int(lengths[run_sign == 1].max(initial=0))
+    max_loss = int(lengths[run_sign == -1].max(initial=0))
+    
+    return max_win, max_loss
+
+
+def prev_loss_streaks(is_loss: np.ndarray) -> np.ndarray:
+    """
+    Calcule le nombre de pertes consécutives précédant chaque trade.
+    
+    Cumul des pertes, remis à zéro à chaque trade non perdant via le max
+    cumulé, puis décalé d'un rang (série *avant* le trade).
+    
+    Args:
+        is_loss: Masque des trades perdants dans l'ordre chronologique
+    
+    Returns:
+        Tableau int64 de même taille (0 pour le premier trade)
+    """
+    losses_cum = np.cumsum(is_loss, dtype=np.int64)
+    streak = losses_cum - np.maximum.accumulate(np.where(is_loss, 0, losses_cum))
+    
+    prev = np.zeros(len(streak), dtype=np.int64)
+    prev[1:] = streak[:-1]
+    return prev
+
+
+def drawdown_stats(pnl: np.ndarray) -> tuple:
+    """
+    Calcule le drawdown maximum et moyen de la courbe de PnL cumulé.
+    
+    Deux tableaux seulement: le cumul, et le pic courant réécrit en place
+    en drawdown (cumul - pic).
+    
+    Args:
+        pnl: Tableau non vide des PnL dans l'ordre chronologique
+    
+    Returns:
+        (max_drawdown, avg_drawdown), négatifs ou nuls; avg_drawdown est la
+        moyenne des points sous le pic (0 s'il n'y en a pas)
+    """
+    cumulative = np.cumsum(pnl)
+    drawdowns = np.maximum.accumulate(cumulative)
+    np.subtract(cumulative, drawdowns, out=drawdowns)
+    
+    underwater = drawdowns[drawdowns < 0]
+    avg_drawdown = underwater.mean() if len(underwater) > 0 else 0
+    
+    return drawdowns.min(), avg_drawdown
+
+
+def bracket_aggregates(codes: np.ndarray, n_brackets: int, pnl: np.ndarray,
+                       is_win: np.ndarray, discipline: np.ndarray) -> dict:
+    """
+    Agrège PnL, win rate et discipline par tranche à partir des codes de tranche.
+    
+    Accumulation indexée (np.bincount) sur les codes entiers: pas de
+    regroupement par hachage. Les codes négatifs (valeur hors tranche / NaN)
+    sont ignorés.
+    
+    Args:
+        codes: Code de tranche de chaque trade (0..n_brackets-1, -1 si aucune)
+        n_brackets: Nombre de tranches
+        pnl, is_win, discipline: Colonnes des trades (mêmes positions que codes)
+    
+    Returns:
+        Dict de tableaux de taille n_brackets: pnl_total, pnl_moyen, nb_trades,
+        winrate (fraction 0-1), discipline_moy (NaN pour une tranche vide)
+    """
+    valid = codes >= 0
+    codes = codes[valid]
+    
+    nb_trades = np.bincount(codes, minlength=n_brackets)
+    pnl_total = np.bincount(codes, weights=pnl[valid], minlength=n_brackets)
+    wins = np.bincount(codes, weights=is_win[valid], minlength=n_brackets)
+    discipline_total = np.bincount(codes, weights=discipline[valid], minlength=n_brackets)
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return {
+            'pnl_total': pnl_total,
+            'pnl_moyen': pnl_total / nb_trades,
+            'nb_trades': nb_trades,
+            'winrate': wins / nb_trades,
+            'discipline_moy': discipline_total / nb_trades,
+        }
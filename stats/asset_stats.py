@@ -5,9 +5,11 @@ Analyse par crypto/paire tradée.
 """
 
 import pandas as pd
-import numpy as np
 
+from stats._common import requires_columns
 
+
+@requires_columns(empty=pd.DataFrame)
 def calculate_asset_stats(df: pd.DataFrame) -> pd.DataFrame:
     """
     Calcule les statistiques par actif/paire.
@@ -15,23 +17,19 @@ def calculate_asset_stats(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         DataFrame avec stats par symbol, trié par PnL total
     """
-    if len(df) == 0:
-        return pd.DataFrame()
-    
-    assets = df.groupby('symbol').agg({
-        'pnl': ['sum', 'mean', 'count'],
-        'is_win': lambda x: (x.sum() / len(x)) * 100 if len(x) > 0 else 0,
-        'discipline_score': 'mean',
-        'is_destructive': lambda x: (x.sum() / len(x)) * 100 if len(x) > 0 else 0,
-        'duration_minutes': 'median',
-        'fees': lambda x: abs(x).sum()
-    }).round(2)
-    
-    assets.columns = [
-        'pnl_total', 'pnl_moyen', 'nb_trades',
-        'winrate', 'discipline_moy', 'pct_destructeurs',
-        'duree_mediane', 'fees_total'
-    ]
+    # Agrégations natives (cython), sans lambda par groupe
+    assets = df.assign(abs_fees=df['fees'].abs()).groupby('symbol', observed=True).agg(
+        pnl_total=('pnl', 'sum'),
+        pnl_moyen=('pnl', 'mean'),
+        nb_trades=('pnl', 'count'),
+        winrate=('is_win', 'mean'),
+        discipline_moy=('discipline_score', 'mean'),
+        pct_destructeurs=('is_destructive', 'mean'),
+        duree_mediane=('duration_minutes', 'median'),
+        fees_total=('abs_fees', 'sum'),
+    )
+    assets[['winrate', 'pct_destructeurs']] *= 100
+    assets = assets.round(2)
     
     # Trier par PnL total (meilleur en premier)
     assets = assets.sort_values('pnl_total', ascending=False)
@@ -71,38 +69,30 @@ def calculate_cross_analysis(df: pd.DataFrame) -> dict:
     """
     result = {}
     
+    # Une seule agrégation du PnL sur toutes les dimensions disponibles;
+    # chaque tableau croisé se déduit de ce résultat déjà réduit
+    # (dropna=False: une clé manquante n'exclut le trade que des tableaux
+    # croisés sur cette dimension, qui la retirent à la ré-agrégation)
+    keys = [col for col in ('symbol', 'hour', 'direction') if col in df.columns]
+    if len(keys) < 2:
+        return result
+    grouped = df.groupby(keys, observed=True, dropna=False)['pnl'].sum()
+    
+    def cross(index: str, columns: str) -> pd.DataFrame:
+        return (grouped.groupby(level=[index, columns], observed=True).sum()
+                .unstack(columns, fill_value=0).round(2))
+    
     # Actif × Heure
-    if 'symbol' in df.columns and 'hour' in df.columns:
-        cross_asset_hour = df.pivot_table(
-            values='pnl',
-            index='symbol',
-            columns='hour',
-            aggfunc='sum',
-            fill_value=0
-        ).round(2)
-        result['asset_hour'] = cross_asset_hour
+    if 'symbol' in keys and 'hour' in keys:
+        result['asset_hour'] = cross('symbol', 'hour')
     
     # Direction × Heure
-    if 'direction' in df.columns and 'hour' in df.columns:
-        cross_dir_hour = df.pivot_table(
-            values='pnl',
-            index='direction',
-            columns='hour',
-            aggfunc='sum',
-            fill_value=0
-        ).round(2)
-        result['direction_hour'] = cross_dir_hour
+    if 'direction' in keys and 'hour' in keys:
+        result['direction_hour'] = cross('direction', 'hour')
     
     # Actif × Direction
-    if 'symbol' in df.columns and 'direction' in df.columns:
-        cross_asset_dir = df.pivot_table(
-            values='pnl',
-            index='symbol',
-            columns='direction',
-            aggfunc='sum',
-            fill_value=0
-        ).round(2)
-        result['asset_direction'] = cross_asset_dir
+    if 'symbol' in keys and 'direction' in keys:
+        result['asset_direction'] = cross('symbol', 'direction')
     
     return result
 
@@ -11,7 +11,11 @@ Détecte les patterns de:
 import pandas as pd
 import numpy as np
 
+from stats._common import requires_columns
+from stats._kernels import max_streaks, prev_loss_streaks
 
+
+@requires_columns()
 def calculate_behavioral_stats(df: pd.DataFrame) -> dict:
     """
     Calcule les statistiques comportementales.
@@ -19,35 +23,45 @@ def calculate_behavioral_stats(df: pd.DataFrame) -> dict:
     Returns:
         Dict avec métriques comportementales
     """
-    if len(df) == 0:
-        return {}
+    # Tableaux NumPy extraits une fois: chaque sous-ensemble est un masque
+    # booléen appliqué au tableau des PnL, sans filtrer le DataFrame
+    columns = df.columns
+    n_trades = len(df)
+    pnl = df['pnl'].to_numpy(dtype=np.float64)
     
     # Séquences de gains/pertes
     max_win_streak, max_loss_streak = calculate_max_streaks(df)
     
+    # Pertes consécutives avant chaque trade (recalculées si la colonne manque)
+    prev_loss_streak = _prev_loss_streak(df)
+    
     # Trades après pertes consécutives
-    pnl_after_losses = calculate_pnl_after_losses(df)
+    pnl_after_losses = _pnl_after_losses(pnl, prev_loss_streak)
     
     # Trades rapides (revenge trading potentiel)
-    quick_trades = df[df.get('time_since_prev', pd.Series([999]*len(df))) < 5]
-    quick_trades_pnl = quick_trades['pnl'].sum() if len(quick_trades) > 0 else 0
+    if 'time_since_prev' in columns:
+        quick_mask = df['time_since_prev'].to_numpy(dtype=np.float64) < 5
+    else:
+        quick_mask = np.zeros(n_trades, dtype=bool)
+    quick_count = int(np.count_nonzero(quick_mask))
+    quick_trades_pnl = pnl[quick_mask].sum() if quick_count > 0 else 0
     
     # Trades "patients" vs "rapides"
-    if 'duration_minutes' in df.columns:
+    if 'duration_minutes' in columns:
+        duration = df['duration_minutes'].to_numpy(dtype=np.float64)
         median_duration = df['duration_minutes'].median()
-        patient_trades = df[df['duration_minutes'] >= median_duration]
-        quick_duration_trades = df[df['duration_minutes'] < median_duration]
+        patient_mask = duration >= median_duration
+        quick_duration_mask = duration < median_duration
         
-        patient_pnl = patient_trades['pnl'].sum() if len(patient_trades) > 0 else 0
-        quick_duration_pnl = quick_duration_trades['pnl'].sum() if len(quick_duration_trades) > 0 else 0
+        patient_pnl = pnl[patient_mask].sum() if patient_mask.any() else 0
+        quick_duration_pnl = pnl[quick_duration_mask].sum() if quick_duration_mask.any() else 0
     else:
         patient_pnl = quick_duration_pnl = 0
     
-    # Revenge trades (après 3+ pertes)
     # Revenge trading = trade après 5+ pertes consécutives
-    revenge_trades = df[df.get('prev_loss_streak', pd.Series([0]*len(df))) >= 5]
-    revenge_count = len(revenge_trades)
-    revenge_pnl = revenge_trades['pnl'].sum() if revenge_count > 0 else 0
+    revenge_mask = prev_loss_streak >= 5
+    revenge_count = int(np.count_nonzero(revenge_mask))
+    revenge_pnl = pnl[revenge_mask].sum() if revenge_count > 0 else 0
     
     return {
         'max_win_streak': max_win_streak,
@@ -55,14 +69,14 @@ def calculate_behavioral_stats(df: pd.DataFrame) -> dict:
         'pnl_after_1_loss': pnl_after_losses.get(1, 0),
         'pnl_after_2_losses': pnl_after_losses.get(2, 0),
         'pnl_after_3_losses': pnl_after_losses.get(3, 0),
-        'quick_entry_count': len(quick_trades),
+        'quick_entry_count': quick_count,
         'quick_entry_pnl': round(quick_trades_pnl, 2),
-        'quick_entry_pct': round((len(quick_trades) / len(df)) * 100, 1) if len(df) > 0 else 0,
+        'quick_entry_pct': round((quick_count / n_trades) * 100, 1),
         'patient_pnl': round(patient_pnl, 2),
         'quick_duration_pnl': round(quick_duration_pnl, 2),
         'revenge_count': revenge_count,
         'revenge_pnl': round(revenge_pnl, 2),
-        'revenge_pct': round((revenge_count / len(df)) * 100, 1) if len(df) > 0 else 0
+        'revenge_pct': round((revenge_count / n_trades) * 100, 1)
     }
 
 
@@ -76,24 +90,21 @@ def calculate_max_streaks(df: pd.DataFrame) -> tuple:
     if len(df) == 0:
         return 0, 0
     
-    max_win = max_loss = 0
-    current_win = current_loss = 0
-    
-    for pnl in df['pnl']:
-        if pnl > 0:
-            current_win += 1
-            current_loss = 0
-            max_win = max(max_win, current_win)
-        elif pnl < 0:
-            current_loss += 1
-            current_win = 0
-            max_loss = max(max_loss, current_loss)
-        else:
-            current_win = current_loss = 0
-    
-    return max_win, max_loss
+    return max_streaks(df['pnl'].to_numpy(dtype=np.float64))
 
 
+def _prev_loss_streak(df: pd.DataFrame) -> np.ndarray:
+    """
+    Pertes consécutives avant chaque trade: colonne prev_loss_streak si le
+    scoring l'a produite, sinon calculée à partir de pnl < 0 (seule la
+    colonne pnl est requise, comme pour les séries max).
+    """
+    if 'prev_loss_streak' in df.columns:
+        return df['prev_loss_streak'].to_numpy()
+    return prev_loss_streaks(df['pnl'].to_numpy(dtype=np.float64) < 0)
+
+
+@requires_columns()
 def calculate_pnl_after_losses(df: pd.DataFrame) -> dict:
     """
     Calcule le PnL des trades pris après 1, 2, 3+ pertes consécutives.
@@ -101,13 +112,15 @@ def calculate_pnl_after_losses(df: pd.DataFrame) -> dict:
     Returns:
         Dict avec {nb_pertes: pnl_total}
     """
-    if len(df) == 0 or 'prev_loss_streak' not in df.columns:
-        return {}
-    
+    return _pnl_after_losses(df['pnl'].to_numpy(dtype=np.float64), _prev_loss_streak(df))
+
+
+def _pnl_after_losses(pnl: np.ndarray, prev_loss_streak: np.ndarray) -> dict:
+    """PnL total des trades pris après exactement 1, 2 et 3 pertes consécutives."""
     result = {}
     for n in [1, 2, 3]:
-        trades_after_n = df[df['prev_loss_streak'] == n]
-        result[n] = round(trades_after_n['pnl'].sum(), 2) if len(trades_after_n) > 0 else 0
+        after_n = prev_loss_streak == n
+        result[n] = round(pnl[after_n].sum(), 2) if after_n.any() else 0
     
     return result
 
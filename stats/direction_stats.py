@@ -7,6 +7,8 @@ Analyse séparée des performances LONG et SHORT.
 import pandas as pd
 import numpy as np
 
+from stats._kernels import drawdown_stats, max_streaks, pnl_aggregates
+
 
 def calculate_direction_stats(df: pd.DataFrame) -> dict:
     """
@@ -17,10 +19,21 @@ def calculate_direction_stats(df: pd.DataFrame) -> dict:
     """
     results = {}
     
-    for direction in ['LONG', 'SHORT']:
-        dir_df = df[df['direction'] == direction]
+    # Partition en une passe: codes de direction (0=LONG, 1=SHORT, 2=autre) triés
+    # de façon stable, chaque direction devient une tranche contiguë du tableau
+    # des PnL (ordre chronologique conservé pour drawdown et séquences)
+    directions = df['direction']
+    codes = np.full(len(df), 2, dtype=np.int8)
+    codes[(directions == 'LONG').to_numpy()] = 0
+    codes[(directions == 'SHORT').to_numpy()] = 1
+    order = np.argsort(codes, kind='stable')
+    pnl = df['pnl'].to_numpy(dtype=np.float64)[order]
+    bounds = np.searchsorted(codes[order], [0, 1, 2])
+    
+    for i, direction in enumerate(['LONG', 'SHORT']):
+        dir_pnl = pnl[bounds[i]:bounds[i + 1]]
         
-        if len(dir_df) == 0:
+        if len(dir_pnl) == 0:
             results[direction.lower()] = {
                 'count': 0,
                 'pnl_total': 0,
@@ -34,34 +47,32 @@ def calculate_direction_stats(df: pd.DataFrame) -> dict:
             continue
         
         # Stats de base
-        pnl_total = dir_df['pnl'].sum()
-        nb_wins = (dir_df['pnl'] > 0).sum()
-        nb_losses = (dir_df['pnl'] < 0).sum()
-        winrate = (nb_wins / len(dir_df)) * 100
+        aggregates = pnl_aggregates(dir_pnl)
+        pnl_total = dir_pnl.sum()
+        nb_wins = aggregates.n_wins
+        nb_losses = aggregates.n_losses
+        winrate = (nb_wins / len(dir_pnl)) * 100
         
         # R:R moyen
-        avg_win = dir_df[dir_df['pnl'] > 0]['pnl'].mean() if nb_wins > 0 else 0
-        avg_loss = abs(dir_df[dir_df['pnl'] < 0]['pnl'].mean()) if nb_losses > 0 else 0
-        avg_rr = avg_win / avg_loss if avg_loss > 0 else 0
+        avg_rr = aggregates.avg_win / aggregates.avg_loss if aggregates.avg_loss > 0 else 0
         
         # Drawdown
-        cumulative = dir_df['pnl'].cumsum()
-        max_dd = (cumulative - cumulative.cummax()).min()
+        max_dd, _ = drawdown_stats(dir_pnl)
         
         # Séquences
-        win_streak, loss_streak = calculate_streaks(dir_df['pnl'])
+        win_streak, loss_streak = max_streaks(dir_pnl)
         
         results[direction.lower()] = {
-            'count': len(dir_df),
+            'count': len(dir_pnl),
             'pnl_total': round(pnl_total, 2),
             'winrate': round(winrate, 1),
-            'avg_pnl': round(dir_df['pnl'].mean(), 2),
+            'avg_pnl': round(dir_pnl.mean(), 2),
             'avg_rr': round(avg_rr, 2),
             'max_drawdown': round(max_dd, 2),
             'max_win_streak': win_streak,
             'max_loss_streak': loss_streak,
-            'nb_wins': int(nb_wins),
-            'nb_losses': int(nb_losses)
+            'nb_wins': nb_wins,
+            'nb_losses': nb_losses
         }
     
     return results
@@ -77,26 +88,7 @@ def calculate_streaks(pnl_series: pd.Series) -> tuple:
     if len(pnl_series) == 0:
         return 0, 0
     
-    wins = (pnl_series > 0).astype(int)
-    losses = (pnl_series < 0).astype(int)
-    
-    # Calculer les séquences
-    max_win = max_loss = 0
-    current_win = current_loss = 0
-    
-    for w, l in zip(wins, losses):
-        if w:
-            current_win += 1
-            current_loss = 0
-            max_win = max(max_win, current_win)
-        elif l:
-            current_loss += 1
-            current_win = 0
-            max_loss = max(max_loss, current_loss)
-        else:
-            current_win = current_loss = 0
-    
-    return max_win, max_loss
+    return max_streaks(pnl_series.to_numpy(dtype=np.float64))
 
 
 def format_direction_comparison(stats: dict) -> pd.DataFrame:
@@ -10,7 +10,16 @@ Analyse du temps en position:
 import pandas as pd
 import numpy as np
 
+from stats._common import requires_columns
+from stats._kernels import bracket_aggregates
 
+
+# Tranches de durée (minutes), bornes inférieures incluses
+_DURATION_BINS = [-np.inf, 5, 15, 60, np.inf]
+_DURATION_LABELS = ['0-5 min', '5-15 min', '15-60 min', '60+ min']
+
+
+@requires_columns('duration_minutes')
 def calculate_duration_stats(df: pd.DataFrame) -> dict:
     """
     Calcule les statistiques de durée.
@@ -18,64 +27,59 @@ def calculate_duration_stats(df: pd.DataFrame) -> dict:
     Returns:
         Dict avec métriques de durée
     """
-    if len(df) == 0 or 'duration_minutes' not in df.columns:
-        return {}
-    
-    wins = df[df['is_win']]
-    losses = df[~df['is_win']]
+    # Colonne de durée extraite une fois, puis découpée par le masque des gains
+    # (pas de sous-DataFrame wins/losses copiant toutes les colonnes)
+    duration = df['duration_minutes']
+    is_win = df['is_win'].to_numpy(dtype=bool)
+    wins = duration[is_win]
+    losses = duration[~is_win]
     
     return {
-        'duration_mean': round(df['duration_minutes'].mean(), 1),
-        'duration_median': round(df['duration_minutes'].median(), 1),
-        'duration_min': round(df['duration_minutes'].min(), 1),
-        'duration_max': round(df['duration_minutes'].max(), 1),
-        'duration_std': round(df['duration_minutes'].std(), 1),
+        'duration_mean': round(duration.mean(), 1),
+        'duration_median': round(duration.median(), 1),
+        'duration_min': round(duration.min(), 1),
+        'duration_max': round(duration.max(), 1),
+        'duration_std': round(duration.std(), 1),
         
         # Comparaison wins vs losses
-        'win_duration_mean': round(wins['duration_minutes'].mean(), 1) if len(wins) > 0 else 0,
-        'win_duration_median': round(wins['duration_minutes'].median(), 1) if len(wins) > 0 else 0,
-        'loss_duration_mean': round(losses['duration_minutes'].mean(), 1) if len(losses) > 0 else 0,
-        'loss_duration_median': round(losses['duration_minutes'].median(), 1) if len(losses) > 0 else 0,
+        'win_duration_mean': round(wins.mean(), 1) if len(wins) > 0 else 0,
+        'win_duration_median': round(wins.median(), 1) if len(wins) > 0 else 0,
+        'loss_duration_mean': round(losses.mean(), 1) if len(losses) > 0 else 0,
+        'loss_duration_median': round(losses.median(), 1) if len(losses) > 0 else 0,
     }
 
 
+@requires_columns('duration_minutes', empty=pd.DataFrame)
 def calculate_duration_brackets(df: pd.DataFrame) -> pd.DataFrame:
     """
     Calcule les performances par tranche de durée.
     
     Tranches: 0-5min, 5-15min, 15-60min, 60min+
     """
-    if len(df) == 0 or 'duration_minutes' not in df.columns:
-        return pd.DataFrame()
-    
-    def get_bracket(duration):
-        if duration < 5:
-            return '0-5 min'
-        elif duration < 15:
-            return '5-15 min'
-        elif duration < 60:
-            return '15-60 min'
-        else:
-            return '60+ min'
-    
-    df = df.copy()
-    df['duration_bracket'] = df['duration_minutes'].apply(get_bracket)
-    
-    brackets = df.groupby('duration_bracket').agg({
-        'pnl': ['sum', 'mean', 'count'],
-        'is_win': lambda x: (x.sum() / len(x)) * 100 if len(x) > 0 else 0,
-        'discipline_score': 'mean'
-    }).round(2)
-    
-    brackets.columns = ['pnl_total', 'pnl_moyen', 'nb_trades', 'winrate', 'discipline_moy']
-    
-    # Ordonner les tranches
-    order = ['0-5 min', '5-15 min', '15-60 min', '60+ min']
-    brackets = brackets.reset_index()
-    brackets['order'] = brackets['duration_bracket'].apply(lambda x: order.index(x) if x in order else 99)
-    brackets = brackets.sort_values('order').drop('order', axis=1)
-    
-    return brackets
+    # Tranches [min, max[ affectées en une passe vectorisée
+    bracket = pd.cut(df['duration_minutes'], bins=_DURATION_BINS, labels=_DURATION_LABELS, right=False)
+    
+    # Durée manquante (code -1): dernière tranche, comme le else de l'ancien if/elif
+    codes = bracket.cat.codes.to_numpy()
+    codes = np.where(codes < 0, len(_DURATION_LABELS) - 1, codes)
+    
+    # Statistiques accumulées directement sur les codes de tranche (sans groupby)
+    aggregates = bracket_aggregates(
+        codes, len(_DURATION_LABELS),
+        df['pnl'].to_numpy(dtype=np.float64),
+        df['is_win'].to_numpy(dtype=np.float64),
+        df['discipline_score'].to_numpy(dtype=np.float64),
+    )
+    
+    # Tranches non vides seulement, dans l'ordre des tranches
+    observed = aggregates['nb_trades'] > 0
+    brackets = pd.DataFrame({
+        'duration_bracket': pd.Categorical.from_codes(np.flatnonzero(observed), dtype=bracket.dtype),
+        **{name: values[observed] for name, values in aggregates.items()},
+    })
+    brackets['winrate'] *= 100
+    
+    return brackets.round(2)
 
 
 def analyze_duration_impact(df: pd.DataFrame, stats: dict) -> str:
@@ -135,11 +139,11 @@ def format_duration_summary(stats: dict, brackets: pd.DataFrame) -> str:
     
     if len(brackets) > 0:
         lines.append("📉 Performance par durée:")
-        for _, row in brackets.iterrows():
-            emoji = "🟢" if row['pnl_total'] > 0 else "🔴"
+        for row in brackets.itertuples(index=False):
+            emoji = "🟢" if row.pnl_total > 0 else "🔴"
             lines.append(
-                f"   {emoji} {row['duration_bracket']}: {row['pnl_total']:.2f}$ "
-                f"(WR: {row['winrate']:.0f}%, {row['nb_trades']} trades)"
+                f"   {emoji} {row.duration_bracket}: {row.pnl_total:.2f}$ "
+                f"(WR: {row.winrate:.0f}%, {row.nb_trades} trades)"
             )
     
     return "\n".join(lines)
@@ -2,17 +2,21 @@
 stats/execution_stats.py - Statistiques d'exécution (Fees)
 """
 import pandas as pd
+import numpy as np
 
+from stats._common import requires_columns
+
+@requires_columns()
 def calculate_execution_stats(df: pd.DataFrame) -> dict:
-    if len(df) == 0:
-        return {}
-    fees_total = df['fees'].abs().sum() if 'fees' in df.columns else 0
+    # Valeur absolue des fees calculée une fois (total et moyenne en découlent)
+    has_fees = 'fees' in df.columns
+    fees_total = np.abs(df['fees'].to_numpy(dtype=np.float64)).sum() if has_fees else 0
     pnl_net = df['pnl'].sum()
     pnl_brut = pnl_net + fees_total
     fees_pct = (fees_total / abs(pnl_brut)) * 100 if pnl_brut != 0 else 0
     return {
         'fees_total': round(fees_total, 2),
-        'fees_mean': round(df['fees'].abs().mean(), 2) if 'fees' in df.columns else 0,
+        'fees_mean': round(fees_total / len(df), 2) if has_fees else 0,
         'pnl_net': round(pnl_net, 2),
         'pnl_brut': round(pnl_brut, 2),
         'fees_pct_of_pnl': round(fees_pct, 1),
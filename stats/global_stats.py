@@ -9,7 +9,11 @@ Calcule les métriques globales de performance:
 import pandas as pd
 import numpy as np
 
+from stats._common import requires_columns
+from stats._kernels import drawdown_stats, pnl_aggregates
 
+
+@requires_columns()
 def calculate_global_stats(df: pd.DataFrame) -> dict:
     """
     Calcule toutes les statistiques de performance globale.
@@ -20,47 +24,44 @@ def calculate_global_stats(df: pd.DataFrame) -> dict:
     Returns:
         Dict avec toutes les métriques
     """
-    if len(df) == 0:
-        return {}
+    # Colonnes extraites une fois en float64: toutes les réductions sont NumPy
+    pnl = np.ascontiguousarray(df['pnl'].to_numpy(dtype=np.float64))
+    n_trades = pnl.size
     
     # PnL
-    pnl_net = df['pnl'].sum()
-    fees_total = df['fees'].abs().sum()
+    pnl_net = pnl.sum()
+    fees_total = np.abs(df['fees'].to_numpy(dtype=np.float64)).sum()
     pnl_brut = pnl_net + fees_total
     
-    # Gains et pertes séparés
-    gains = df[df['pnl'] > 0]['pnl'].sum()
-    losses = abs(df[df['pnl'] < 0]['pnl'].sum())
+    # Gains et pertes séparés (masques et agrégats calculés une seule fois)
+    aggregates = pnl_aggregates(pnl)
+    gains = aggregates.gains_sum
+    losses = aggregates.losses_sum
     
     # Profit Factor
     profit_factor = gains / losses if losses > 0 else float('inf')
     
     # Expectancy (EV par trade)
-    expectancy = pnl_net / len(df)
+    expectancy = pnl_net / n_trades
     
-    # Sharpe simplifié (mean / std)
-    pnl_std = df['pnl'].std()
-    sharpe = df['pnl'].mean() / pnl_std if pnl_std > 0 else 0
+    # Sharpe simplifié (mean / std, écart-type échantillon; indéfini pour un seul trade)
+    pnl_std = pnl.std(ddof=1) if n_trades > 1 else np.nan
+    sharpe = expectancy / pnl_std if pnl_std > 0 else 0
     
     # Drawdown
-    cumulative_pnl = df['pnl'].cumsum()
-    rolling_max = cumulative_pnl.cummax()
-    drawdowns = cumulative_pnl - rolling_max
-    
-    max_drawdown = drawdowns.min()
-    avg_drawdown = drawdowns[drawdowns < 0].mean() if len(drawdowns[drawdowns < 0]) > 0 else 0
+    max_drawdown, avg_drawdown = drawdown_stats(pnl)
     
     # Recovery Factor
     recovery_factor = abs(pnl_net / max_drawdown) if max_drawdown < 0 else float('inf')
     
     # Win rate
-    nb_wins = (df['pnl'] > 0).sum()
-    nb_losses = (df['pnl'] < 0).sum()
-    winrate = (nb_wins / len(df)) * 100
+    nb_wins = aggregates.n_wins
+    nb_losses = aggregates.n_losses
+    winrate = (nb_wins / n_trades) * 100
     
     # R:R moyen (gain moyen / perte moyenne)
-    avg_win = df[df['pnl'] > 0]['pnl'].mean() if nb_wins > 0 else 0
-    avg_loss = abs(df[df['pnl'] < 0]['pnl'].mean()) if nb_losses > 0 else 0
+    avg_win = aggregates.avg_win
+    avg_loss = aggregates.avg_loss
     avg_rr = avg_win / avg_loss if avg_loss > 0 else float('inf')
     
     return {
@@ -74,7 +75,7 @@ def calculate_global_stats(df: pd.DataFrame) -> dict:
         'avg_drawdown': round(avg_drawdown, 2),
         'recovery_factor': round(recovery_factor, 2),
         'winrate': round(winrate, 1),
-        'nb_trades': len(df),
+        'nb_trades': n_trades,
         'nb_wins': int(nb_wins),
         'nb_losses': int(nb_losses),
         'avg_win': round(avg_win, 2),
@@ -7,7 +7,16 @@ Analyse par levier, taille de position.
 import pandas as pd
 import numpy as np
 
+from stats._common import requires_columns
+from stats._kernels import bracket_aggregates
 
+
+# Tranches de levier, bornes inférieures incluses
+_LEVERAGE_BINS = [-np.inf, 20, 40, np.inf]
+_LEVERAGE_LABELS = ['<20x', '20-40x', '40x+']
+
+
+@requires_columns('leverage')
 def calculate_risk_stats(df: pd.DataFrame) -> dict:
     """
     Calcule les statistiques de risque.
@@ -15,9 +24,6 @@ def calculate_risk_stats(df: pd.DataFrame) -> dict:
     Returns:
         Dict avec métriques de risque
     """
-    if len(df) == 0 or 'leverage' not in df.columns:
-        return {}
-    
     return {
         'leverage_mean': round(df['leverage'].mean(), 1),
         'leverage_median': round(df['leverage'].median(), 1),
@@ -26,43 +32,37 @@ def calculate_risk_stats(df: pd.DataFrame) -> dict:
     }
 
 
+@requires_columns('leverage', empty=pd.DataFrame)
 def calculate_leverage_brackets(df: pd.DataFrame) -> pd.DataFrame:
     """
     Calcule les performances par tranche de levier.
     
     Tranches: <20x, 20-40x, 40x+
     """
-    if len(df) == 0 or 'leverage' not in df.columns:
-        return pd.DataFrame()
-    
-    # Créer les tranches
-    def get_bracket(lev):
-        if lev < 20:
-            return '<20x'
-        elif lev < 40:
-            return '20-40x'
-        else:
-            return '40x+'
-    
-    df = df.copy()
-    df['leverage_bracket'] = df['leverage'].apply(get_bracket)
-    
-    # Statistiques par tranche
-    brackets = df.groupby('leverage_bracket').agg({
-        'pnl': ['sum', 'mean', 'count'],
-        'is_win': lambda x: (x.sum() / len(x)) * 100 if len(x) > 0 else 0,
-        'discipline_score': 'mean'
-    }).round(2)
-    
-    brackets.columns = ['pnl_total', 'pnl_moyen', 'nb_trades', 'winrate', 'discipline_moy']
-    
-    # Ordonner les tranches
-    order = ['<20x', '20-40x', '40x+']
-    brackets = brackets.reset_index()
-    brackets['order'] = brackets['leverage_bracket'].apply(lambda x: order.index(x) if x in order else 99)
-    brackets = brackets.sort_values('order').drop('order', axis=1)
-    
-    return brackets
+    # Créer les tranches ([min, max[, affectées en une passe vectorisée)
+    bracket = pd.cut(df['leverage'], bins=_LEVERAGE_BINS, labels=_LEVERAGE_LABELS, right=False)
+    
+    # Levier manquant (code -1): dernière tranche, comme le else de l'ancien if/elif
+    codes = bracket.cat.codes.to_numpy()
+    codes = np.where(codes < 0, len(_LEVERAGE_LABELS) - 1, codes)
+    
+    # Statistiques accumulées directement sur les codes de tranche (sans groupby)
+    aggregates = bracket_aggregates(
+        codes, len(_LEVERAGE_LABELS),
+        df['pnl'].to_numpy(dtype=np.float64),
+        df['is_win'].to_numpy(dtype=np.float64),
+        df['discipline_score'].to_numpy(dtype=np.float64),
+    )
+    
+    # Tranches non vides seulement, dans l'ordre des tranches
+    observed = aggregates['nb_trades'] > 0
+    brackets = pd.DataFrame({
+        'leverage_bracket': pd.Categorical.from_codes(np.flatnonzero(observed), dtype=bracket.dtype),
+        **{name: values[observed] for name, values in aggregates.items()},
+    })
+    brackets['winrate'] *= 100
+    
+    return brackets.round(2)
 
 
 def analyze_leverage_impact(df: pd.DataFrame) -> str:
@@ -122,11 +122,11 @@ def format_risk_summary(stats: dict, brackets: pd.DataFrame) -> str:
     
     if len(brackets) > 0:
         lines.append("📉 Performance par tranche de levier:")
-        for _, row in brackets.iterrows():
-            emoji = "🟢" if row['pnl_total'] > 0 else "🔴"
+        for row in brackets.itertuples(index=False):
+            emoji = "🟢" if row.pnl_total > 0 else "🔴"
             lines.append(
-                f"   {emoji} {row['leverage_bracket']}: {row['pnl_total']:.2f}$ "
-                f"(WR: {row['winrate']:.0f}%, {row['nb_trades']} trades)"
+                f"   {emoji} {row.leverage_bracket}: {row.pnl_total:.2f}$ "
+                f"(WR: {row.winrate:.0f}%, {row.nb_trades} trades)"
             )
     
     return "\n".join(lines)
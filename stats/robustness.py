@@ -2,31 +2,81 @@
 stats/robustness.py - Analyse de robustesse (Monte Carlo)
 Module optionnel activé par bouton.
 """
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+
 import pandas as pd
 import numpy as np
+from typing import Optional
+
+from stats._common import requires_columns
+
+# Nombre max d'éléments (simulations x trades) traités par bloc: ~8 Mo en float64
+_MC_BLOCK_ELEMENTS = 1 << 20
+
+def _mc_block(pnls: np.ndarray, n_rows: int, rng: np.random.Generator) -> tuple:
+    """
+    Simule un bloc de n_rows séquences (une ligne par séquence mélangée).
+    
+    Mélange, cumul et drawdown sont des opérations par axe, sans boucle par simulation.
+    
+    Returns:
+        (final_pnl, max_dd), deux tableaux de taille n_rows
+    """
+    # Une permutation indépendante par ligne, cumul en place
+    cumsum = rng.permuted(np.broadcast_to(pnls, (n_rows, len(pnls))), axis=1)
+    np.cumsum(cumsum, axis=1, out=cumsum)
+    drawdown = np.maximum.accumulate(cumsum, axis=1)
+    np.subtract(cumsum, drawdown, out=drawdown)
+    return cumsum[:, -1], drawdown.min(axis=1)
+
+def _mc_kernel(pnls: np.ndarray, n_simulations: int, rng: np.random.Generator) -> tuple:
+    """
+    Cœur de la simulation: PnL final et drawdown max de chaque séquence mélangée.
+    
+    Les simulations sont découpées en blocs de taille bornée (mémoire),
+    répartis sur plusieurs threads: les opérations NumPy par bloc libèrent
+    le GIL. Chaque bloc a son propre générateur, dérivé de rng: le résultat
+    ne dépend pas du nombre de cœurs.
+    
+    Returns:
+        (final_pnl, max_dd), deux tableaux de taille n_simulations
+    """
+    block = max(1, _MC_BLOCK_ELEMENTS // len(pnls))
+    sizes = [min(block, n_simulations - start) for start in range(0, n_simulations, block)]
+    if len(sizes) <= 1:
+        return _mc_block(pnls, n_simulations, rng)
+    
+    rngs = [np.random.default_rng(child_seed) for child_seed in rng.integers(2**63, size=len(sizes))]
+    with ThreadPoolExecutor(max_workers=min(len(sizes), os.cpu_count() or 1)) as executor:
+        results = list(executor.map(_mc_block, repeat(pnls), sizes, rngs))
+    return (np.concatenate([final_pnl for final_pnl, _ in results]),
+            np.concatenate([max_dd for _, max_dd in results]))
 
-def monte_carlo_simulation(df: pd.DataFrame, n_simulations: int = 1000) -> dict:
-    """Simule n_simulations séquences aléatoires de trades."""
-    if len(df) == 0:
-        return {}
-    pnls = df['pnl'].values
-    results = []
-    for _ in range(n_simulations):
-        shuffled = np.random.permutation(pnls)
-        cumsum = np.cumsum(shuffled)
-        final_pnl = cumsum[-1]
-        max_dd = (cumsum - np.maximum.accumulate(cumsum)).min()
-        results.append({'final_pnl': final_pnl, 'max_dd': max_dd})
-    results_df = pd.DataFrame(results)
+@requires_columns()
+def monte_carlo_simulation(df: pd.DataFrame, n_simulations: int = 1000,
+                           seed: Optional[int] = None) -> dict:
+    """
+    Simule n_simulations séquences aléatoires de trades.
+    
+    Args:
+        df: DataFrame des trades
+        n_simulations: Nombre de séquences simulées
+        seed: Graine du générateur (résultat reproductible, donc cachable)
+    """
+    rng = np.random.default_rng(seed)
+    final_pnl, max_dd = _mc_kernel(df['pnl'].to_numpy(dtype=np.float64), n_simulations, rng)
+    pnl_5th, pnl_50th, pnl_95th = np.quantile(final_pnl, [0.05, 0.5, 0.95])
     return {
-        'mean_pnl': round(results_df['final_pnl'].mean(), 2),
-        'median_pnl': round(results_df['final_pnl'].median(), 2),
-        'pnl_5th': round(results_df['final_pnl'].quantile(0.05), 2),
-        'pnl_95th': round(results_df['final_pnl'].quantile(0.95), 2),
-        'worst_pnl': round(results_df['final_pnl'].min(), 2),
-        'best_pnl': round(results_df['final_pnl'].max(), 2),
-        'mean_dd': round(results_df['max_dd'].mean(), 2),
-        'worst_dd': round(results_df['max_dd'].min(), 2),
+        'mean_pnl': round(final_pnl.mean(), 2),
+        'median_pnl': round(pnl_50th, 2),
+        'pnl_5th': round(pnl_5th, 2),
+        'pnl_95th': round(pnl_95th, 2),
+        'worst_pnl': round(final_pnl.min(), 2),
+        'best_pnl': round(final_pnl.max(), 2),
+        'mean_dd': round(max_dd.mean(), 2),
+        'worst_dd': round(max_dd.min(), 2),
     }
 
 def calculate_rolling_expectancy(df: pd.DataFrame, window: int = 20) -> pd.Series:
@@ -10,7 +10,11 @@ Analyse par:
 import pandas as pd
 import numpy as np
 
+from stats._common import requires_columns
+from stats._kernels import drawdown_stats
 
+
+@requires_columns(empty=pd.DataFrame)
 def calculate_hourly_stats(df: pd.DataFrame) -> pd.DataFrame:
     """
     Calcule les statistiques par heure (0-23).
@@ -18,30 +22,31 @@ def calculate_hourly_stats(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         DataFrame avec stats par heure
     """
-    if len(df) == 0:
-        return pd.DataFrame()
-    
     hourly = df.groupby('hour').agg({
         'pnl': ['sum', 'mean', 'count'],
-        'is_win': lambda x: (x.sum() / len(x)) * 100 if len(x) > 0 else 0,
+        'is_win': 'mean',
         'discipline_score': 'mean'
-    }).round(2)
+    })
     
     hourly.columns = ['pnl_total', 'pnl_moyen', 'nb_trades', 'winrate', 'discipline_moy']
-    
-    # Calculer le drawdown par heure
-    def calc_hour_dd(hour):
-        hour_df = df[df['hour'] == hour]
-        if len(hour_df) < 2:
-            return 0
-        cumsum = hour_df['pnl'].cumsum()
-        return (cumsum - cumsum.cummax()).min()
-    
-    hourly['drawdown'] = [calc_hour_dd(h) for h in hourly.index]
+    # Win rate = moyenne du booléen is_win (agrégation native, sans lambda)
+    hourly['winrate'] *= 100
+    hourly = hourly.round(2)
+    
+    # Drawdown par heure: un tri stable par heure rend chaque heure contiguë
+    # (ordre des trades conservé), puis cumul et pic courant NumPy par tranche
+    hours = df['hour'].to_numpy()
+    order = np.argsort(hours, kind='stable')
+    sorted_hours = hours[order]
+    pnl = df['pnl'].to_numpy(dtype=np.float64)[order]
+    starts = np.flatnonzero(np.r_[True, sorted_hours[1:] != sorted_hours[:-1]])
+    ends = np.r_[starts[1:], len(sorted_hours)]
+    hourly['drawdown'] = [drawdown_stats(pnl[start:end])[0] for start, end in zip(starts, ends)]
     
     return hourly.reset_index()
 
 
+@requires_columns(empty=pd.DataFrame)
 def calculate_session_stats(df: pd.DataFrame) -> pd.DataFrame:
     """
     Calcule les statistiques par session de trading.
@@ -52,45 +57,68 @@ def calculate_session_stats(df: pd.DataFrame) -> pd.DataFrame:
     - Europe (Overlap): 14:00-17:00
     - US: 17:00-01:00
     """
-    if len(df) == 0:
-        return pd.DataFrame()
-    
-    session = df.groupby('session').agg({
+    session = df.groupby('session', observed=True).agg({
         'pnl': ['sum', 'mean', 'count'],
-        'is_win': lambda x: (x.sum() / len(x)) * 100 if len(x) > 0 else 0,
+        'is_win': 'mean',
         'discipline_score': 'mean',
         'duration_minutes': 'median'
-    }).round(2)
+    })
     
     session.columns = ['pnl_total', 'pnl_moyen', 'nb_trades', 'winrate', 'discipline_moy', 'duree_mediane']
+    session['winrate'] *= 100
+    session = session.round(2)
     
     return session.reset_index()
 
 
+@requires_columns(empty=pd.DataFrame)
 def calculate_daily_stats(df: pd.DataFrame) -> pd.DataFrame:
     """
     Calcule les statistiques par jour de la semaine.
     """
-    if len(df) == 0:
-        return pd.DataFrame()
+    # Jours en catégoriel ordonné du lundi au dimanche: le groupby trie
+    # directement dans l'ordre de la semaine (sans effet si déjà ce type)
+    day_order = pd.CategoricalDtype(['Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi', 'Samedi', 'Dimanche'],
+                                    ordered=True)
     
-    # Ordre des jours
-    day_order = ['Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi', 'Samedi', 'Dimanche']
-    
-    daily = df.groupby('day_name').agg({
+    daily = df.groupby(df['day_name'].astype(day_order), observed=True).agg({
         'pnl': ['sum', 'mean', 'count'],
-        'is_win': lambda x: (x.sum() / len(x)) * 100 if len(x) > 0 else 0,
+        'is_win': 'mean',
         'discipline_score': 'mean'
-    }).round(2)
+    })
     
     daily.columns = ['pnl_total', 'pnl_moyen', 'nb_trades', 'winrate', 'discipline_moy']
-    daily = daily.reset_index()
+    daily['winrate'] *= 100
+    daily = daily.round(2)
+    
+    return daily.reset_index()
+
+
+def partition_hours(hourly_stats: pd.DataFrame, threshold: float = 0) -> tuple:
+    """
+    Sépare les heures profitables et toxiques avec un seul tri des PnL.
     
-    # Trier par ordre des jours
-    daily['day_order'] = daily['day_name'].apply(lambda x: day_order.index(x) if x in day_order else 7)
-    daily = daily.sort_values('day_order').drop('day_order', axis=1)
+    Args:
+        hourly_stats: DataFrame de calculate_hourly_stats
+        threshold: Seuil de PnL total (exclu des deux listes)
     
-    return daily
+    Returns:
+        (profitable, toxic): heures profitables (meilleure d'abord) et
+        heures toxiques (pire d'abord)
+    """
+    if len(hourly_stats) == 0:
+        return [], []
+    
+    # Tri croissant unique: les toxiques sont en tête, les profitables en
+    # queue (lues à l'envers)
+    pnl_total = hourly_stats['pnl_total'].to_numpy()
+    order = np.argsort(pnl_total, kind='stable')
+    sorted_pnl = pnl_total[order]
+    sorted_hours = hourly_stats['hour'].to_numpy()[order]
+    
+    toxic = sorted_hours[sorted_pnl < threshold].tolist()
+    profitable = sorted_hours[sorted_pnl > threshold][::-1].tolist()
+    return profitable, toxic
 
 
 def get_toxic_hours(hourly_stats: pd.DataFrame, threshold: float = 0) -> list:
@@ -100,11 +128,7 @@ def get_toxic_hours(hourly_stats: pd.DataFrame, threshold: float = 0) -> list:
     Returns:
         Liste des heures toxiques triées par PnL (pire d'abord)
     """
-    if len(hourly_stats) == 0:
-        return []
-    
-    toxic = hourly_stats[hourly_stats['pnl_total'] < threshold]
-    return toxic.sort_values('pnl_total')['hour'].tolist()
+    return partition_hours(hourly_stats, threshold)[1]
 
 
 def get_profitable_hours(hourly_stats: pd.DataFrame, threshold: float = 0) -> list:
@@ -114,11 +138,7 @@ def get_profitable_hours(hourly_stats: pd.DataFrame, threshold: float = 0) -> li
     Returns:
         Liste des heures profitables triées par PnL (meilleure d'abord)
     """
-    if len(hourly_stats) == 0:
-        return []
-    
-    profitable = hourly_stats[hourly_stats['pnl_total'] > threshold]
-    return profitable.sort_values('pnl_total', ascending=False)['hour'].tolist()
+    return partition_hours(hourly_stats, threshold)[0]
 
 
 def format_temporal_summary(hourly: pd.DataFrame, sessions: pd.DataFrame, daily: pd.DataFrame) -> str:
@@ -127,27 +147,34 @@ def format_temporal_summary(hourly: pd.DataFrame, sessions: pd.DataFrame, daily:
     """
     lines = []
     
+    # Tableaux de quelques lignes: classement direct sur les PnL en NumPy
+    # (tri stable: à égalité, la première ligne l'emporte, comme nlargest/idxmax)
+    
     # Top heures profitables
     if len(hourly) > 0:
-        best_hours = hourly.nlargest(3, 'pnl_total')
-        worst_hours = hourly.nsmallest(3, 'pnl_total')
+        pnl_total = hourly['pnl_total'].to_numpy()
+        hours = hourly['hour'].to_numpy()
+        best_hours = hours[np.argsort(-pnl_total, kind='stable')[:3]]
+        worst_hours = hours[np.argsort(pnl_total, kind='stable')[:3]]
         
         lines.append("⏰ HEURES:")
-        lines.append(f"  ✅ Meilleures: {', '.join(f'{int(h)}h' for h in best_hours['hour'])}")
-        lines.append(f"  🚫 Pires: {', '.join(f'{int(h)}h' for h in worst_hours['hour'])}")
+        lines.append(f"  ✅ Meilleures: {', '.join(f'{int(h)}h' for h in best_hours)}")
+        lines.append(f"  🚫 Pires: {', '.join(f'{int(h)}h' for h in worst_hours)}")
     
     # Sessions
     if len(sessions) > 0:
-        best_session = sessions.loc[sessions['pnl_total'].idxmax(), 'session']
-        worst_session = sessions.loc[sessions['pnl_total'].idxmin(), 'session']
+        pnl_total = sessions['pnl_total'].to_numpy()
+        best_session = sessions['session'].iloc[np.argmax(pnl_total)]
+        worst_session = sessions['session'].iloc[np.argmin(pnl_total)]
         lines.append(f"\n🌍 SESSIONS:")
         lines.append(f"  ✅ Meilleure: {best_session}")
         lines.append(f"  🚫 Pire: {worst_session}")
     
     # Jours
     if len(daily) > 0:
-        best_day = daily.loc[daily['pnl_total'].idxmax(), 'day_name']
-        worst_day = daily.loc[daily['pnl_total'].idxmin(), 'day_name']
+        pnl_total = daily['pnl_total'].to_numpy()
+        best_day = daily['day_name'].iloc[np.argmax(pnl_total)]
+        worst_day = daily['day_name'].iloc[np.argmin(pnl_total)]
         lines.append(f"\n📅 JOURS:")
         lines.append(f"  ✅ Meilleur: {best_day}")
         lines.append(f"  🚫 Pire: {worst_day}")
@@ -10,6 +10,12 @@ Types de trades:
 import pandas as pd
 import numpy as np
 
+from stats._common import sorted_trades
+from stats._kernels import drawdown_stats, prev_loss_streaks
+
+# Ordre d'affichage des types dans les tableaux de stats
+TRADE_TYPE_ORDER = ['swing', 'scalp', 'high_lev', 'standard']
+
 
 def classify_trade_type(duration_min: float, leverage: float) -> str:
     """
@@ -35,21 +41,115 @@ def classify_trade_type(duration_min: float, leverage: float) -> str:
         return 'standard'
 
 
-def add_trade_type_column(df: pd.DataFrame) -> pd.DataFrame:
+def _classify_trade_types(df: pd.DataFrame) -> np.ndarray:
+    """
+    Classifie tous les trades en une fois (mêmes règles que classify_trade_type).
+    
+    Returns:
+        Codes des types: rang dans TRADE_TYPE_ORDER (int8)
+    """
+    # Valeurs par défaut si colonne absente: durée 0, levier 1
+    n = len(df)
+    duration = df['duration_minutes'].to_numpy(dtype=np.float64) if 'duration_minutes' in df.columns else np.zeros(n)
+    leverage = df['leverage'].to_numpy(dtype=np.float64) if 'leverage' in df.columns else np.ones(n)
+    
+    # Premier cas vrai retenu: le levier prend la priorité sur la durée
+    return np.select(
+        [leverage >= 50, duration < 5, duration > 60],
+        [TRADE_TYPE_ORDER.index('high_lev'), TRADE_TYPE_ORDER.index('scalp'), TRADE_TYPE_ORDER.index('swing')],
+        default=TRADE_TYPE_ORDER.index('standard')
+    ).astype(np.int8)
+
+
+def _trade_type_codes(df: pd.DataFrame) -> np.ndarray:
+    """Codes des types (rang dans TRADE_TYPE_ORDER, -1 si inconnu), classifiés si la colonne manque."""
+    if 'trade_type' in df.columns:
+        return pd.Categorical(df['trade_type'], categories=TRADE_TYPE_ORDER).codes
+    return _classify_trade_types(df)
+
+
+def add_trade_type_column(df: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
     """
-    Ajoute une colonne 'trade_type' au DataFrame.
+    Ajoute une colonne 'trade_type' (catégorielle, ordre TRADE_TYPE_ORDER) au DataFrame.
+    
+    Args:
+        df: DataFrame des trades
+        inplace: Ajouter la colonne à df lui-même plutôt qu'à une copie légère
     """
-    df = df.copy()
-    df['trade_type'] = df.apply(
-        lambda row: classify_trade_type(
-            row.get('duration_minutes', 0),
-            row.get('leverage', 1)
-        ),
-        axis=1
-    )
+    if not inplace:
+        df = df.copy(deep=False)
+    df['trade_type'] = pd.Categorical.from_codes(_classify_trade_types(df), categories=TRADE_TYPE_ORDER)
     return df
 
 
+def _trade_group_stats(df: pd.DataFrame, codes: np.ndarray, n_groups: int) -> dict:
+    """
+    Agrège les trades par groupe à partir d'un code de groupe entier par trade.
+    
+    Sommes et comptages par accumulation indexée (np.bincount), sans
+    sous-DataFrame par groupe; médiane et drawdown, qui dépendent de l'ordre
+    des valeurs, sont calculés sur des tranches d'un tri unique par groupe.
+    
+    Args:
+        codes: Code de groupe de chaque trade (0..n_groups-1, -1 si hors tableau)
+        n_groups: Nombre de groupes
+    
+    Returns:
+        Dict de tableaux de taille n_groups (colonnes du tableau affiché, non arrondies)
+    """
+    pnl = df['pnl'].to_numpy(dtype=np.float64)
+    valid = codes >= 0
+    group = codes[valid]
+    pnl_valid = pnl[valid]
+    
+    def group_sum(weights=None):
+        return np.bincount(group, weights=weights, minlength=n_groups)
+    
+    nb = group_sum()
+    nb_wins = group_sum(pnl_valid > 0)
+    nb_losses = group_sum(pnl_valid < 0)
+    gains = group_sum(np.maximum(pnl_valid, 0))
+    losses = group_sum(np.minimum(pnl_valid, 0))
+    
+    # Tri stable par code: chaque groupe devient une tranche contiguë, dans
+    # l'ordre chronologique des trades (nécessaire au drawdown)
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(n_groups + 1))
+    pnl_sorted = pnl[order]
+    duration_sorted = df['duration_minutes'].to_numpy(dtype=np.float64)[order]
+    
+    duration_median = np.full(n_groups, np.nan)
+    max_dd = np.zeros(n_groups)
+    for k in np.flatnonzero(nb):
+        start, end = bounds[k], bounds[k + 1]
+        duration_median[k] = np.nanmedian(duration_sorted[start:end])
+        max_dd[k] = drawdown_stats(pnl_sorted[start:end])[0]
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        stats = {
+            'Nb trades': nb,
+            'PnL net ($)': group_sum(pnl_valid),
+            'Winrate (%)': nb_wins / nb * 100,
+            'Avg win ($)': np.where(nb_wins > 0, gains / nb_wins, 0),
+            'Avg loss ($)': np.where(nb_losses > 0, losses / nb_losses, 0),
+            'Profit Factor': np.where(losses < 0, gains / -losses, np.inf),
+            'Durée méd (min)': duration_median,
+            'Max DD ($)': max_dd,
+        }
+    for column, key in (('pnl_gross', 'PnL brut ($)'), ('fees', 'Fees ($)')):
+        stats[key] = group_sum(df[column].to_numpy(dtype=np.float64)[valid]) if column in df.columns else np.zeros(n_groups, dtype=np.int64)
+    
+    return stats
+
+
+def _round_columns(stats: dict, observed: np.ndarray) -> dict:
+    """Garde les groupes observés et arrondit comme l'affichage (1 décimale: win rate, durée)."""
+    return {
+        key: values[observed].round(1 if key in ('Winrate (%)', 'Durée méd (min)') else 2)
+        for key, values in stats.items()
+    }
+
+
 def calculate_trade_type_stats(df: pd.DataFrame) -> pd.DataFrame:
     """
     Calcule les statistiques par type de trade.
@@ -57,84 +157,61 @@ def calculate_trade_type_stats(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         DataFrame avec stats par type (comme dans l'image)
     """
-    if 'trade_type' not in df.columns:
-        df = add_trade_type_column(df)
-    
-    stats = []
-    for trade_type in ['swing', 'scalp', 'high_lev', 'standard']:
-        subset = df[df['trade_type'] == trade_type]
-        if len(subset) == 0:
-            continue
-            
-        wins = subset[subset['pnl'] > 0]
-        losses = subset[subset['pnl'] < 0]
-        
-        total_gains = wins['pnl'].sum() if len(wins) > 0 else 0
-        total_losses = abs(losses['pnl'].sum()) if len(losses) > 0 else 0
-        
-        stats.append({
-            'Setup': trade_type.upper(),
-            'Nb trades': len(subset),
-            'PnL net ($)': round(subset['pnl'].sum(), 2),
-            'PnL brut ($)': round(subset['pnl_gross'].sum(), 2) if 'pnl_gross' in subset.columns else 0,
-            'Fees ($)': round(subset['fees'].sum(), 2) if 'fees' in subset.columns else 0,
-            'Winrate (%)': round(len(wins) / len(subset) * 100, 1) if len(subset) > 0 else 0,
-            'Avg win ($)': round(wins['pnl'].mean(), 2) if len(wins) > 0 else 0,
-            'Avg loss ($)': round(losses['pnl'].mean(), 2) if len(losses) > 0 else 0,
-            'Profit Factor': round(total_gains / total_losses, 2) if total_losses > 0 else float('inf'),
-            'Durée méd (min)': round(subset['duration_minutes'].median(), 1),
-            'Max DD ($)': round(calculate_max_drawdown(subset), 2)
-        })
-    
-    return pd.DataFrame(stats)
+    # Code de groupe = rang du type dans l'ordre d'affichage (-1: type inconnu),
+    # classifié à la volée si la colonne manque (sans copie du DataFrame)
+    codes = _trade_type_codes(df)
+    stats = _trade_group_stats(df, codes, len(TRADE_TYPE_ORDER))
+    observed = stats['Nb trades'] > 0
+    if not observed.any():
+        return pd.DataFrame()
+    
+    stats = _round_columns(stats, observed)
+    columns = ['Nb trades', 'PnL net ($)', 'PnL brut ($)', 'Fees ($)', 'Winrate (%)', 'Avg win ($)',
+               'Avg loss ($)', 'Profit Factor', 'Durée méd (min)', 'Max DD ($)']
+    
+    return pd.DataFrame({
+        'Setup': [t.upper() for t in np.asarray(TRADE_TYPE_ORDER)[observed]],
+        **{column: stats[column] for column in columns},
+    })
 
 
 def calculate_trade_type_by_direction(df: pd.DataFrame) -> pd.DataFrame:
     """
     Calcule les statistiques par type de trade ET direction.
     """
-    if 'trade_type' not in df.columns:
-        df = add_trade_type_column(df)
-    
-    stats = []
-    for trade_type in ['swing', 'scalp', 'high_lev', 'standard']:
-        for direction in ['LONG', 'SHORT']:
-            subset = df[(df['trade_type'] == trade_type) & (df['direction'] == direction)]
-            if len(subset) == 0:
-                continue
-                
-            wins = subset[subset['pnl'] > 0]
-            losses = subset[subset['pnl'] < 0]
-            
-            total_gains = wins['pnl'].sum() if len(wins) > 0 else 0
-            total_losses = abs(losses['pnl'].sum()) if len(losses) > 0 else 0
-            
-            stats.append({
-                'Setup': trade_type.upper(),
-                'Direction': direction,
-                'Nb trades': len(subset),
-                'PnL net ($)': round(subset['pnl'].sum(), 2),
-                'Winrate (%)': round(len(wins) / len(subset) * 100, 1) if len(subset) > 0 else 0,
-                'Avg win ($)': round(wins['pnl'].mean(), 2) if len(wins) > 0 else 0,
-                'Avg loss ($)': round(losses['pnl'].mean(), 2) if len(losses) > 0 else 0,
-                'Profit Factor': round(total_gains / total_losses, 2) if total_losses > 0 else 0,
-                'Durée méd (min)': round(subset['duration_minutes'].median(), 1)
-            })
-    
-    return pd.DataFrame(stats)
+    # Code de groupe = type * 2 + direction (LONG=0, SHORT=1), dans l'ordre d'affichage
+    directions = ['LONG', 'SHORT']
+    type_codes = _trade_type_codes(df)
+    direction_codes = pd.Categorical(df['direction'], categories=directions).codes
+    codes = np.where((type_codes >= 0) & (direction_codes >= 0), type_codes * len(directions) + direction_codes, -1)
+    
+    stats = _trade_group_stats(df, codes, len(TRADE_TYPE_ORDER) * len(directions))
+    observed = stats['Nb trades'] > 0
+    if not observed.any():
+        return pd.DataFrame()
+    
+    stats = _round_columns(stats, observed)
+    # Sans perte, le Profit Factor de ce tableau vaut 0
+    stats['Profit Factor'][np.isinf(stats['Profit Factor'])] = 0
+    columns = ['Nb trades', 'PnL net ($)', 'Winrate (%)', 'Avg win ($)', 'Avg loss ($)',
+               'Profit Factor', 'Durée méd (min)']
+    observed_codes = np.flatnonzero(observed)
+    
+    return pd.DataFrame({
+        'Setup': [TRADE_TYPE_ORDER[k // len(directions)].upper() for k in observed_codes],
+        'Direction': [directions[k % len(directions)] for k in observed_codes],
+        **{column: stats[column] for column in columns},
+    })
 
 
 def calculate_max_drawdown(df: pd.DataFrame) -> float:
     """Calcule le max drawdown d'un subset de trades."""
     if len(df) == 0:
         return 0
-    cumsum = df['pnl'].cumsum()
-    peak = cumsum.cummax()
-    dd = cumsum - peak
-    return dd.min()
+    return drawdown_stats(df['pnl'].to_numpy(dtype=np.float64))[0]
 
 
-def calculate_tiltmeter(df: pd.DataFrame) -> dict:
+def calculate_tiltmeter(trades) -> dict:
     """
     Calcule le Tiltmeter - score émotionnel basé sur les patterns comportementaux.
     
@@ -147,27 +224,25 @@ def calculate_tiltmeter(df: pd.DataFrame) -> dict:
     - Overtrading (trop de trades en peu de temps)
     - Trades impulsifs (< 5 min après le précédent)
     - Trades en dehors des heures optimales
+    
+    Args:
+        trades: DataFrame des trades ou SortedTrades (tri partagé)
     """
-    if len(df) == 0:
+    trades = sorted_trades(trades)
+    n_trades = len(trades.pnl)
+    if n_trades == 0:
         return {'score': 100, 'status': 'neutral', 'alerts': []}
     
     score = 100
     alerts = []
     
-    # Calculer les métriques de tilt
-    df_sorted = df.sort_values('close_time').copy()
+    # Tableaux triés par date de clôture (tri partagé, sans copie du DataFrame)
+    close_time = trades.close_time
+    is_loss = trades.pnl < 0
     
     # 1. Revenge trading - trades après 5+ pertes consécutives
-    # Calculer les séries de pertes
-    df_sorted['is_loss'] = df_sorted['pnl'] < 0
-    df_sorted['loss_streak'] = df_sorted['is_loss'].groupby(
-        (~df_sorted['is_loss']).cumsum()
-    ).cumsum()
-    df_sorted['prev_loss_streak'] = df_sorted['loss_streak'].shift(1).fillna(0)
-    
-    # Revenge = trade après 5+ pertes consécutives
-    revenge_trades = df_sorted[df_sorted['prev_loss_streak'] >= 5]
-    revenge_pct = len(revenge_trades) / len(df) * 100 if len(df) > 0 else 0
+    revenge_count = int(np.count_nonzero(prev_loss_streaks(is_loss) >= 5))
+    revenge_pct = revenge_count / n_trades * 100
     if revenge_pct > 20:
         score -= 25
         alerts.append("🔥 Revenge trading détecté")
@@ -176,9 +251,11 @@ def calculate_tiltmeter(df: pd.DataFrame) -> dict:
         alerts.append("⚠️ Tendance au revenge trading")
     
     # 2. Overtrading - plus de 10 trades par jour en moyenne
-    df_sorted['date'] = df_sorted['close_time'].dt.date
-    trades_per_day = df_sorted.groupby('date').size()
-    avg_trades = trades_per_day.mean()
+    # (moyenne des trades par date de clôture = trades datés / dates distinctes)
+    dates = close_time.astype('datetime64[D]')
+    dates = dates[~np.isnat(dates)]
+    n_days = len(np.unique(dates))
+    avg_trades = np.float64(len(dates)) / n_days if n_days > 0 else np.nan
     if avg_trades > 15:
         score -= 20
         alerts.append("🚨 Overtrading sévère")
@@ -187,11 +264,8 @@ def calculate_tiltmeter(df: pd.DataFrame) -> dict:
         alerts.append("⚠️ Tendance à l'overtrading")
     
     # 3. Trades impulsifs - moins de 5 min après le précédent
-    df_sorted['time_since_prev'] = (
-        df_sorted['close_time'] - df_sorted['close_time'].shift(1)
-    ).dt.total_seconds() / 60
-    impulsive = df_sorted[df_sorted['time_since_prev'] < 5]
-    impulsive_pct = len(impulsive) / len(df) * 100 if len(df) > 0 else 0
+    impulsive_count = int(np.count_nonzero(np.diff(close_time) < np.timedelta64(5, 'm')))
+    impulsive_pct = impulsive_count / n_trades * 100
     if impulsive_pct > 30:
         score -= 20
         alerts.append("💨 Trop de trades impulsifs")
@@ -200,8 +274,7 @@ def calculate_tiltmeter(df: pd.DataFrame) -> dict:
         alerts.append("⚡ Trades impulsifs fréquents")
     
     # 4. Trades perdants récents (derniers 5 trades)
-    last_trades = df_sorted.tail(5)
-    recent_losses = (last_trades['pnl'] < 0).sum()
+    recent_losses = np.count_nonzero(is_loss[-5:])
     if recent_losses >= 4:
         score -= 15
         alerts.append("📉 Série de pertes récente")
@@ -9,21 +9,39 @@ import numpy as np
 import calendar
 from datetime import datetime
 
+from stats._common import sorted_trades
 
-def generate_equity_curve_data(df: pd.DataFrame) -> pd.DataFrame:
+
+def generate_equity_curve_data(trades) -> tuple:
     """
     Génère les données pour l'equity curve.
     
+    Args:
+        trades: DataFrame des trades ou SortedTrades (tri partagé)
+    
     Returns:
-        DataFrame avec date et PnL cumulé
+        (close_time, cumulative_pnl, pnl): tableaux NumPy triés par date de clôture
     """
-    if len(df) == 0:
-        return pd.DataFrame()
+    trades = sorted_trades(trades)
+    return trades.close_time, np.cumsum(trades.pnl), trades.pnl
+
+
+def generate_equity_and_drawdown(trades) -> tuple:
+    """
+    Génère equity curve et drawdown en une passe (un cumul, un pic courant).
     
-    df = df.copy().sort_values('close_time')
-    df['cumulative_pnl'] = df['pnl'].cumsum()
+    Args:
+        trades: DataFrame des trades ou SortedTrades (tri partagé)
     
-    return df[['close_time', 'pnl', 'cumulative_pnl', 'symbol', 'direction']].reset_index(drop=True)
+    Returns:
+        (close_time, cumulative_pnl, pnl, drawdown): tableaux NumPy triés par date de clôture
+    """
+    trades = sorted_trades(trades)
+    cumulative = np.cumsum(trades.pnl)
+    drawdown = np.maximum.accumulate(cumulative)
+    np.subtract(cumulative, drawdown, out=drawdown)
+    
+    return trades.close_time, cumulative, trades.pnl, drawdown
 
 
 def generate_calendar_heatmap_data(df: pd.DataFrame) -> pd.DataFrame:
@@ -36,23 +54,25 @@ def generate_calendar_heatmap_data(df: pd.DataFrame) -> pd.DataFrame:
     if len(df) == 0:
         return pd.DataFrame()
     
-    df = df.copy()
-    df['date'] = df['close_time'].dt.date
+    # Jour calendaire local arrondi en datetime64 (pas d'objets date Python),
+    # extrait une fois; les composantes du calendrier sont lues à la fin
+    close_time = df['close_time']
+    if close_time.dt.tz is not None:
+        close_time = close_time.dt.tz_localize(None)
     
-    daily = df.groupby('date').agg({
-        'pnl': 'sum',
-        'symbol': 'count',
-        'is_win': 'sum'
-    }).reset_index()
+    daily = df.groupby(close_time.dt.floor('D').rename('date')).agg(
+        pnl=('pnl', 'sum'),
+        nb_trades=('pnl', 'size'),
+        nb_wins=('is_win', 'sum')
+    ).reset_index()
     
-    daily.columns = ['date', 'pnl', 'nb_trades', 'nb_wins']
     daily['winrate'] = (daily['nb_wins'] / daily['nb_trades'] * 100).round(1)
-    daily['date'] = pd.to_datetime(daily['date'])
-    daily['day'] = daily['date'].dt.day
-    daily['month'] = daily['date'].dt.month
-    daily['year'] = daily['date'].dt.year
-    daily['weekday'] = daily['date'].dt.weekday  # 0=Monday
-    daily['week'] = daily['date'].dt.isocalendar().week
+    dates = daily['date'].dt
+    daily['day'] = dates.day
+    daily['month'] = dates.month
+    daily['year'] = dates.year
+    daily['weekday'] = dates.weekday  # 0=Monday
+    daily['week'] = dates.isocalendar().week
     
     return daily
 
@@ -61,33 +81,42 @@ def get_monthly_calendar_matrix(daily_data: pd.DataFrame, year: int, month: int)
     """
     Génère une matrice calendrier pour un mois donné.
     
+    Les valeurs du mois sont rangées dans des tableaux indexés par numéro de
+    jour (0 = case hors du mois), puis lues d'un coup pour toute la grille.
+    
     Returns:
         Liste de semaines, chaque semaine est une liste de 7 jours
         Chaque jour est un dict avec {day, pnl, nb_trades} ou None
     """
     month_data = daily_data[
         (daily_data['year'] == year) & (daily_data['month'] == month)
-    ].set_index('day').to_dict('index')
+    ]
     
     cal = calendar.Calendar(firstweekday=0)  # Monday first
-    weeks = []
-    
-    for week in cal.monthdayscalendar(year, month):
-        week_data = []
-        for day in week:
-            if day == 0:
-                week_data.append(None)
-            else:
-                day_info = month_data.get(day, {})
-                week_data.append({
-                    'day': day,
-                    'pnl': day_info.get('pnl', 0),
-                    'nb_trades': day_info.get('nb_trades', 0),
-                    'winrate': day_info.get('winrate', 0)
-                })
-        weeks.append(week_data)
-    
-    return weeks
+    grid = np.array(cal.monthdayscalendar(year, month))
+    
+    # Tableaux par jour (1-31): un jour sans trade garde les valeurs par défaut 0
+    days = month_data['day'].to_numpy()
+    by_day = {}
+    for column in ('pnl', 'nb_trades', 'winrate'):
+        values = np.zeros(32, dtype=object)
+        values[days] = month_data[column].tolist()
+        by_day[column] = values[grid].tolist()
+    
+    return [
+        [
+            None if day == 0 else {
+                'day': day,
+                'pnl': pnl,
+                'nb_trades': nb_trades,
+                'winrate': winrate
+            }
+            for day, pnl, nb_trades, winrate in zip(week, week_pnl, week_trades, week_winrate)
+        ]
+        for week, week_pnl, week_trades, week_winrate in zip(
+            grid.tolist(), by_day['pnl'], by_day['nb_trades'], by_day['winrate']
+        )
+    ]
 
 
 def get_pnl_color(pnl: float, max_abs_pnl: float) -> str:
@@ -111,16 +140,15 @@ def get_pnl_color(pnl: float, max_abs_pnl: float) -> str:
         return f"background-color: rgba({red}, 76, 60, {0.3 + intensity * 0.7});"
 
 
-def generate_drawdown_data(df: pd.DataFrame) -> pd.DataFrame:
+def generate_drawdown_data(trades) -> pd.DataFrame:
     """
     Génère les données de drawdown pour overlay sur equity curve.
+    
+    Args:
+        trades: DataFrame des trades ou SortedTrades (tri partagé)
     """
-    if len(df) == 0:
+    close_time, _, pnl, drawdown = generate_equity_and_drawdown(trades)
+    if len(pnl) == 0:
         return pd.DataFrame()
     
-    df = df.copy().sort_values('close_time')
-    df['cumulative_pnl'] = df['pnl'].cumsum()
-    df['peak'] = df['cumulative_pnl'].cummax()
-    df['drawdown'] = df['cumulative_pnl'] - df['peak']
-    
-    return df[['close_time', 'drawdown']].reset_index(drop=True)
+    return pd.DataFrame({'close_time': close_time, 'drawdown': drawdown})
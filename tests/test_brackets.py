@@ -0,0 +1,38 @@
+"""
+tests/test_brackets.py - Tranches de durée et de levier
+"""
+import numpy as np
+import pandas as pd
+
+from stats.duration_stats import calculate_duration_brackets
+from stats.risk_stats import calculate_leverage_brackets
+
+
+def _trades() -> pd.DataFrame:
+    """Quatre trades dont un sans durée ni levier."""
+    pnl = np.array([1.0, -2.0, 3.0, -4.0])
+    return pd.DataFrame({
+        'pnl': pnl,
+        'is_win': pnl > 0,
+        'discipline_score': [100, 70, 90, 50],
+        'duration_minutes': [2.0, 30.0, np.nan, 90.0],
+        'leverage': [10.0, np.nan, 25.0, 50.0],
+    })
+
+
+def test_missing_duration_goes_to_last_bracket():
+    """Durée manquante: tranche '60+ min' (else de l'ancien if/elif), pas ignorée."""
+    brackets = calculate_duration_brackets(_trades()).set_index('duration_bracket')
+    
+    assert brackets['nb_trades'].sum() == 4
+    assert brackets.loc['60+ min', 'nb_trades'] == 2
+    assert brackets.loc['60+ min', 'pnl_total'] == -1.0
+
+
+def test_missing_leverage_goes_to_last_bracket():
+    """Levier manquant: tranche '40x+', pas ignoré."""
+    brackets = calculate_leverage_brackets(_trades()).set_index('leverage_bracket')
+    
+    assert brackets['nb_trades'].sum() == 4
+    assert brackets.loc['40x+', 'nb_trades'] == 2
+    assert brackets.loc['40x+', 'pnl_total'] == -6.0
@@ -0,0 +1,83 @@
+"""
+tests/test_data_loader.py - Chargement des CSV de positions par blocs
+"""
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import (_normalize_positions_chunked, _to_datetime, detect_datetime_format,
+                         load_file, normalize_positions)
+
+
+def _positions_csv(n: int = 60) -> bytes:
+    """Export de positions MEXC synthétique (format texte du CSV)."""
+    rng = np.random.default_rng(0)
+    opens = pd.Timestamp('2025-01-06') + pd.to_timedelta(np.arange(n) * 5, unit='h')
+    closes = opens + pd.to_timedelta(rng.integers(1, 240, n), unit='min')
+    positions = pd.DataFrame({
+        'Futures': rng.choice(['BTC_USDT', 'ETH_USDT', 'SOL_USDT'], n),
+        'Open Time': opens.strftime('%Y-%m-%d %H:%M:%S'),
+        'Close Time': closes.strftime('%Y-%m-%d %H:%M:%S'),
+        'Direction': rng.choice(['Long', 'Short'], n),
+        'Trading Fee': [f"{-fee:.4f} USDT" for fee in rng.uniform(0.1, 0.5, n)],
+        'Realized PNL': [f"{pnl:.2f} USDT" for pnl in rng.normal(0, 20, n)],
+    })
+    return positions.to_csv(index=False).encode()
+
+
+def test_chunked_positions_match_single_read():
+    """Petits blocs (catégories différentes d'un bloc à l'autre, day_name ordonné)."""
+    raw = _positions_csv()
+    
+    chunked = _normalize_positions_chunked(BytesIO(raw), chunksize=7)
+    expected = normalize_positions(pd.read_csv(BytesIO(raw)))
+    
+    assert chunked['day_name'].cat.ordered
+    pd.testing.assert_frame_equal(chunked, expected)
+
+
+def test_csv_reader_does_not_change_time_dtypes(tmp_path):
+    """Lecture directe (pyarrow si installé) et lecture par blocs: mêmes dtypes de dates."""
+    path = tmp_path / 'positions.csv'
+    path.write_bytes(_positions_csv())
+    
+    direct = normalize_positions(load_file(str(path)))
+    chunked = _normalize_positions_chunked(str(path), chunksize=7)
+    
+    for col in ('open_time', 'close_time'):
+        assert direct[col].dtype == chunked[col].dtype == 'datetime64[ns]'
+
+
+def test_missing_close_time_is_rejected():
+    """Une date de clôture vide ne doit pas produire d'heure ni de jour inventés."""
+    positions = pd.read_csv(BytesIO(_positions_csv(5)))
+    positions.loc[2, 'Close Time'] = np.nan
+    
+    with pytest.raises(ValueError, match="Date de clôture manquante"):
+        normalize_positions(positions)
+
+
+def test_ambiguous_slash_dates_parse_month_first():
+    """Jours et mois tous <= 12: mois en premier, comme pd.to_datetime sans format."""
+    dates = pd.Series(['03/04/2025 10:00:00', '05/06/2025 11:30:00'])
+    
+    assert detect_datetime_format(dates) == '%m/%d/%Y %H:%M:%S'
+    assert _to_datetime(dates).tolist() == [pd.Timestamp('2025-03-04 10:00'), pd.Timestamp('2025-05-06 11:30')]
+
+
+def test_slash_dates_with_day_above_12_parse_day_first():
+    """Un jour > 12 dans l'échantillon impose le jour en premier."""
+    dates = pd.Series(['03/04/2025 10:00', '25/06/2025 11:30'])
+    
+    assert detect_datetime_format(dates) == '%d/%m/%Y %H:%M'
+    assert _to_datetime(dates).tolist() == [pd.Timestamp('2025-04-03 10:00'), pd.Timestamp('2025-06-25 11:30')]
+
+
+def test_mixed_date_formats_fall_back_to_mixed_parsing():
+    """Aucun format commun ni ISO 8601: repli sur format='mixed' (mois en premier)."""
+    dates = pd.Series(['2025-01-02 10:00:00', '03/04/2025 11:30'])
+    
+    assert detect_datetime_format(dates) is None
+    assert _to_datetime(dates).tolist() == [pd.Timestamp('2025-01-02 10:00'), pd.Timestamp('2025-03-04 11:30')]